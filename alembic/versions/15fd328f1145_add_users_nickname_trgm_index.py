@@ -0,0 +1,29 @@
+"""add users nickname trgm index
+
+Revision ID: 15fd328f1145
+Revises: 9fd3348379a0
+Create Date: 2026-10-17 12:41:19.752806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '15fd328f1145'
+down_revision: Union[str, None] = '9fd3348379a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_users_nickname_trgm', 'users', [sa.text('lower(nickname) gin_trgm_ops')], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_nickname_trgm', table_name='users')
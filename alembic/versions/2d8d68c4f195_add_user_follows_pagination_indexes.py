@@ -0,0 +1,30 @@
+"""add user_follows pagination indexes
+
+Revision ID: 2d8d68c4f195
+Revises: eea224f3b75b
+Create Date: 2026-10-17 10:03:17.284550
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d8d68c4f195'
+down_revision: Union[str, None] = 'eea224f3b75b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_follows_follower_created_followed', 'user_follows', ['follower_id', 'created_at', 'followed_id'], unique=False)
+    op.create_index('ix_user_follows_followed_created_follower', 'user_follows', ['followed_id', 'created_at', 'follower_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_follows_followed_created_follower', table_name='user_follows')
+    op.drop_index('ix_user_follows_follower_created_followed', table_name='user_follows')
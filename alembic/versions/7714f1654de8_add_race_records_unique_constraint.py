@@ -0,0 +1,28 @@
+"""add race_records unique constraint for bulk ingestion
+
+Revision ID: 7714f1654de8
+Revises: 15fd328f1145
+Create Date: 2026-10-17 13:20:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7714f1654de8'
+down_revision: Union[str, None] = '15fd328f1145'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint('uq_race_record_user_track_start', 'race_records', ['user_id', 'track_id', 'start_time'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_race_record_user_track_start', 'race_records', type_='unique')
@@ -0,0 +1,38 @@
+"""add pg_trgm name indexes for events/tracks/seasons/regions
+
+Revision ID: 9fd3348379a0
+Revises: fe9e97d1596e
+Create Date: 2026-10-17 12:08:44.360219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fd3348379a0'
+down_revision: Union[str, None] = 'fe9e97d1596e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = [
+    ('ix_events_name_trgm', 'events'),
+    ('ix_tracks_name_trgm', 'tracks'),
+    ('ix_seasons_name_trgm', 'seasons'),
+    ('ix_regions_name_trgm', 'regions'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table_name in TRGM_INDEXES:
+        op.create_index(index_name, table_name, [sa.text('lower(name) gin_trgm_ops')], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name, table_name in reversed(TRGM_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,86 @@
+"""add standings rollup tables
+
+Revision ID: a5e07c2d4f19
+Revises: b3c81e5a90d2
+Create Date: 2026-10-17 14:31:27.860514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5e07c2d4f19'
+down_revision: Union[str, None] = 'b3c81e5a90d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_track_bests',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('track_id', sa.UUID(), nullable=False),
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('season_id', sa.UUID(), nullable=False),
+    sa.Column('best_score', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['track_id'], ['tracks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'track_id')
+    )
+    op.create_table('season_standings',
+    sa.Column('season_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total_score', sa.Float(), server_default='0', nullable=False),
+    sa.Column('track_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('season_id', 'user_id')
+    )
+    op.create_index('ix_season_standings_season_score_user', 'season_standings', ['season_id', sa.text('total_score DESC'), 'user_id'], unique=False)
+    op.create_table('event_standings',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total_score', sa.Float(), server_default='0', nullable=False),
+    sa.Column('track_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'user_id')
+    )
+    op.create_index('ix_event_standings_event_score_user', 'event_standings', ['event_id', sa.text('total_score DESC'), 'user_id'], unique=False)
+    # 根据现有成绩回填
+    op.execute("""
+        INSERT INTO user_track_bests (user_id, track_id, event_id, season_id, best_score)
+        SELECT user_id, track_id, event_id, season_id, max(score)
+        FROM race_records
+        WHERE status = '已完成' AND score IS NOT NULL
+        GROUP BY user_id, track_id, event_id, season_id
+    """)
+    op.execute("""
+        INSERT INTO season_standings (season_id, user_id, total_score, track_count)
+        SELECT season_id, user_id, sum(best_score), count(*)
+        FROM user_track_bests
+        GROUP BY season_id, user_id
+    """)
+    op.execute("""
+        INSERT INTO event_standings (event_id, user_id, total_score, track_count)
+        SELECT event_id, user_id, sum(best_score), count(*)
+        FROM user_track_bests
+        GROUP BY event_id, user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_event_standings_event_score_user', table_name='event_standings')
+    op.drop_table('event_standings')
+    op.drop_index('ix_season_standings_season_score_user', table_name='season_standings')
+    op.drop_table('season_standings')
+    op.drop_table('user_track_bests')
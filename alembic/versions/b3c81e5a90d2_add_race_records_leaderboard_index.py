@@ -0,0 +1,28 @@
+"""add race_records leaderboard index
+
+Revision ID: b3c81e5a90d2
+Revises: 7714f1654de8
+Create Date: 2026-10-17 13:48:05.527193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c81e5a90d2'
+down_revision: Union[str, None] = '7714f1654de8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_race_records_track_user_duration', 'race_records', ['track_id', 'user_id', 'duration_seconds'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_race_records_track_user_duration', table_name='race_records')
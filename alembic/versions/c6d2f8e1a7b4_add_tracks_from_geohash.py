@@ -0,0 +1,39 @@
+"""add tracks from_geohash
+
+Revision ID: c6d2f8e1a7b4
+Revises: a5e07c2d4f19
+Create Date: 2026-10-17 15:02:44.318960
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.geo import geohash_encode
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d2f8e1a7b4'
+down_revision: Union[str, None] = 'a5e07c2d4f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tracks', sa.Column('from_geohash', sa.String(length=12, collation='C'), nullable=True))
+    # 为已有赛道回填起点 geohash
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, from_lat, from_lng FROM tracks")).all()
+    if rows:
+        conn.execute(
+            sa.text("UPDATE tracks SET from_geohash = :geohash WHERE id = :id"),
+            [{"id": row.id, "geohash": geohash_encode(row.from_lat, row.from_lng)} for row in rows]
+        )
+    op.create_index('ix_tracks_from_geohash', 'tracks', ['from_geohash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tracks_from_geohash', table_name='tracks')
+    op.drop_column('tracks', 'from_geohash')
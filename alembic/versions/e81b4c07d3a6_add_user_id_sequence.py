@@ -0,0 +1,28 @@
+"""add user_id sequence
+
+Revision ID: e81b4c07d3a6
+Revises: c6d2f8e1a7b4
+Create Date: 2026-10-17 16:40:13.902251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b4c07d3a6'
+down_revision: Union[str, None] = 'c6d2f8e1a7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('user_id_seq')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence('user_id_seq')))
@@ -0,0 +1,53 @@
+"""add user_relation_counts table
+
+Revision ID: eea224f3b75b
+Revises: d4661c4e5953
+Create Date: 2026-10-17 09:12:41.503127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eea224f3b75b'
+down_revision: Union[str, None] = 'd4661c4e5953'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_relation_counts',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('following_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('friend_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # 根据现有关注关系回填计数
+    op.execute("""
+        INSERT INTO user_relation_counts (user_id, following_count, follower_count, friend_count)
+        SELECT u.id,
+               COALESCE(fg.cnt, 0) - COALESCE(fr.cnt, 0),
+               COALESCE(fl.cnt, 0) - COALESCE(fr.cnt, 0),
+               COALESCE(fr.cnt, 0)
+        FROM users u
+        LEFT JOIN (SELECT follower_id AS user_id, count(*) AS cnt FROM user_follows GROUP BY follower_id) fg ON fg.user_id = u.id
+        LEFT JOIN (SELECT followed_id AS user_id, count(*) AS cnt FROM user_follows GROUP BY followed_id) fl ON fl.user_id = u.id
+        LEFT JOIN (
+            SELECT a.follower_id AS user_id, count(*) AS cnt
+            FROM user_follows a
+            JOIN user_follows b ON b.follower_id = a.followed_id AND b.followed_id = a.follower_id
+            GROUP BY a.follower_id
+        ) fr ON fr.user_id = u.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_relation_counts')
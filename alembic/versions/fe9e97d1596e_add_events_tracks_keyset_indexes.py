@@ -0,0 +1,30 @@
+"""add events & tracks keyset pagination indexes
+
+Revision ID: fe9e97d1596e
+Revises: 2d8d68c4f195
+Create Date: 2026-10-17 11:26:05.917342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe9e97d1596e'
+down_revision: Union[str, None] = '2d8d68c4f195'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_created_at_event_id', 'events', ['created_at', 'event_id'], unique=False)
+    op.create_index('ix_tracks_created_at_track_id', 'tracks', ['created_at', 'track_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tracks_created_at_track_id', table_name='tracks')
+    op.drop_index('ix_events_created_at_event_id', table_name='events')
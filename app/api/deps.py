@@ -1,16 +1,18 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from app.core.security import verify_token
 from app.schemas.base import BizException
 from app.schemas.user import AuthContext, UserRole
 from app.core.errors import ErrorCode
-from app.db.session import get_db
+from app.db.session import get_db, get_read_session
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.models import User
-from sqlalchemy import select
+from app.services.user import get_cached_user_role
+from jose import jwt, JWTError
+from typing import Optional
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/user/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/user/login", auto_error=False)
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     result = verify_token(token)
@@ -25,11 +27,26 @@ async def get_current_admin(
     ctx: AuthContext = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(User).where(User.user_id == ctx.payload["user_id"])
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    role = await get_cached_user_role(ctx.payload["user_id"], db)
 
-    if not user or user.role != UserRole.admin.value:
+    if role != UserRole.admin:
         raise BizException(code=ErrorCode.NO_PERMISSION, message="无权限访问")
 
     return ctx
+
+
+async def get_read_db(
+    request: Request,
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+):
+    # 只读接口使用从库；登录用户本人及查询参数中的 user_id/my_id 最近有写入时仍读主库（read-your-writes）
+    # token 只用于选择数据源，不做校验，鉴权仍由 get_current_user 负责
+    user_ids = {request.query_params.get("user_id"), request.query_params.get("my_id")}
+    if token:
+        try:
+            user_ids.add(jwt.get_unverified_claims(token).get("user_id"))
+        except JWTError:
+            pass
+    user_ids.discard(None)
+    async for session in get_read_session(list(user_ids)):
+        yield session
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.internal import user, competition
+from app.api.internal import user, competition, race_record, system
 
 
 router = APIRouter()
 router.include_router(user.router, prefix="/user", tags=["用户"])
-router.include_router(competition.router, prefix="/competition", tags="比赛")
\ No newline at end of file
+router.include_router(competition.router, prefix="/competition", tags="比赛")
+router.include_router(race_record.router, prefix="/race_record", tags=["成绩"])
+router.include_router(system.router, prefix="/system", tags=["系统"])
\ No newline at end of file
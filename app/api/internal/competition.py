@@ -7,7 +7,8 @@ from app.schemas.competition import (
     SeasonCreateForm, EventCreateForm, 
     TrackCreateForm, EventUpdateForm, 
     TrackUpdateForm, EventListResponse, 
-    TrackListResponse, RegionCreate
+    TrackListResponse, RegionCreate,
+    CatalogImportRequest, CatalogImportResponse
 )
 from app.services.competition import (
     create_season_service, 
@@ -16,11 +17,13 @@ from app.services.competition import (
     update_event_image_url, update_track_image_url,
     query_events_service, query_tracks_service,
     create_region_service, 
-    update_season_image_url
+    update_season_image_url,
+    import_catalog_service, import_catalog_csv_service,
+    CATALOG_IMPORT_MAX_BYTES
 )
+from app.services.image import save_image
 from app.api.deps import get_current_admin
-from typing import Optional, List
-from pathlib import Path
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
@@ -38,12 +41,7 @@ async def create_season(
     new_season = await create_season_service(db, season, image_url)
 
     if season_image:
-        season_folder = Path("resources/season") / new_season.season_id
-        season_folder.mkdir(parents=True, exist_ok=True)
-        background_path = season_folder / f"background_{int(datetime.now().timestamp())}.png"
-        with background_path.open("wb") as f:
-            f.write(await season_image.read())
-        new_url = f"/resources/season/{new_season.season_id}/{background_path.name}"
+        new_url = await save_image(season_image)
         await update_season_image_url(db, new_season.season_id, new_url)
     return BaseResponse.success(token=auth.new_token, message=f"成功创建{season.sport_type}:{season.name}", data=None)
 
@@ -71,12 +69,7 @@ async def create_event(
     new_event = await create_event_service(db, event, image_url)
 
     if event_image:
-        event_folder = Path("resources/event") / new_event.event_id
-        event_folder.mkdir(parents=True, exist_ok=True)
-        background_path = event_folder / f"background_{int(datetime.now().timestamp())}.png"
-        with background_path.open("wb") as f:
-            f.write(await event_image.read())
-        new_url = f"/resources/event/{new_event.event_id}/{background_path.name}"
+        new_url = await save_image(event_image)
         await update_event_image_url(db, new_event.event_id, new_url)
 
     return BaseResponse.success(token=auth.new_token, message=f"成功创建赛事:{event.name}", data=None)
@@ -92,14 +85,7 @@ async def update_event(
 ):
     image_url = "/resources/placeholder/event.png"
     if event_image:
-        event_folder = Path("resources/event") / event.event_id
-        event_folder.mkdir(parents=True, exist_ok=True)
-        for file in event_folder.glob("background_*.png"):
-            file.unlink(missing_ok=True)
-        bg_path = event_folder / f"background_{int(datetime.now().timestamp())}.png"
-        with bg_path.open("wb") as f:
-            f.write(await event_image.read())
-        image_url = f"/resources/event/{event.event_id}/{bg_path.name}"
+        image_url = await save_image(event_image)
     await update_event_service(db, event, image_url)
 
     return BaseResponse.success(token=auth.new_token, message=f"成功更新赛事:{event.name}", data=None)
@@ -112,8 +98,11 @@ async def query_events(
     region_name: Optional[str] = Query(None),
     sport_type: Optional[str] = Query(None),
     event_name: Optional[str] = Query(None),
-    page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1),
+    page: Optional[int] = Query(None, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor_created_at: Optional[datetime] = Query(None),
+    cursor_id: Optional[str] = Query(None),
+    with_total: bool = Query(False),
     auth: AuthContext = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
@@ -123,10 +112,13 @@ async def query_events(
         region_name=region_name,
         sport_type=sport_type,
         event_name=event_name,
+        size=size,
         page=page,
-        size=size
+        cursor_created_at=cursor_created_at,
+        cursor_id=cursor_id,
+        with_total=with_total
     )
-    return BaseResponse.success(token=auth.new_token, data=EventListResponse(events=events))
+    return BaseResponse.success(token=auth.new_token, data=events)
 
 
 # 创建新赛事
@@ -141,12 +133,7 @@ async def create_track(
     new_track = await create_track_service(db, track, image_url)
 
     if track_image:
-        track_folder = Path("resources/track") / new_track.track_id
-        track_folder.mkdir(parents=True, exist_ok=True)
-        background_path = track_folder / f"background_{int(datetime.now().timestamp())}.png"
-        with background_path.open("wb") as f:
-            f.write(await track_image.read())
-        new_url = f"/resources/track/{new_track.track_id}/{background_path.name}"
+        new_url = await save_image(track_image)
         await update_track_image_url(db, new_track.track_id, new_url)
 
     return BaseResponse.success(token=auth.new_token, message=f"成功创建赛道:{track.name}", data=None)
@@ -162,14 +149,7 @@ async def update_track(
 ):
     image_url = "/resources/placeholder/track.png"
     if track_image:
-        track_folder = Path("resources/track") / track.track_id
-        track_folder.mkdir(parents=True, exist_ok=True)
-        for file in track_folder.glob("background_*.png"):
-            file.unlink(missing_ok=True)
-        bg_path = track_folder / f"background_{int(datetime.now().timestamp())}.png"
-        with bg_path.open("wb") as f:
-            f.write(await track_image.read())
-        image_url = f"/resources/track/{track.track_id}/{bg_path.name}"
+        image_url = await save_image(track_image)
     await update_track_service(db, track, image_url)
 
     return BaseResponse.success(token=auth.new_token, message=f"成功更新赛道:{track.name}", data=None)
@@ -183,8 +163,11 @@ async def query_tracks(
     season_name: Optional[str] = Query(None),
     region_name: Optional[str] = Query(None),
     sport_type: Optional[str] = Query(None),
-    page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1),
+    page: Optional[int] = Query(None, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor_created_at: Optional[datetime] = Query(None),
+    cursor_id: Optional[str] = Query(None),
+    with_total: bool = Query(False),
     auth: AuthContext = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
@@ -195,7 +178,34 @@ async def query_tracks(
         season_name=season_name,
         region_name=region_name,
         sport_type=sport_type,
+        size=size,
         page=page,
-        size=size
+        cursor_created_at=cursor_created_at,
+        cursor_id=cursor_id,
+        with_total=with_total
     )
-    return BaseResponse.success(token=auth.new_token, data=TrackListResponse(tracks=tracks))
\ No newline at end of file
+    return BaseResponse.success(token=auth.new_token, data=tracks)
+
+
+# 批量导入赛季/赛事/赛道
+@router.post("/import_catalog", response_model=BaseResponse[CatalogImportResponse], summary="批量导入赛季/赛事/赛道")
+async def import_catalog(
+    data: CatalogImportRequest,
+    auth: AuthContext = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await import_catalog_service(db, data)
+    return BaseResponse.success(token=auth.new_token, message=f"成功导入赛季{result.seasons}个、赛事{result.events}个、赛道{result.tracks}个", data=result)
+
+
+# 通过 CSV 批量导入赛季/赛事/赛道
+@router.post("/import_catalog_csv", response_model=BaseResponse[CatalogImportResponse], summary="通过CSV批量导入赛季/赛事/赛道")
+async def import_catalog_csv(
+    kind: Literal["season", "event", "track"] = Query(...),
+    file: UploadFile = File(...),
+    auth: AuthContext = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    content = await file.read(CATALOG_IMPORT_MAX_BYTES + 1)
+    result = await import_catalog_csv_service(db, kind, content)
+    return BaseResponse.success(token=auth.new_token, message=f"成功导入赛季{result.seasons}个、赛事{result.events}个、赛道{result.tracks}个", data=result)
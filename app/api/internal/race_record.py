@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db
+from app.schemas.base import BaseResponse
+from app.schemas.user import AuthContext
+from app.schemas.race_record import RaceRecordBatchRequest, RaceRecordBatchResponse
+from app.services.race_record import ingest_race_records_service
+from app.services.leaderboard import rebuild_track_leaderboard_service
+from app.api.deps import get_current_admin
+
+
+router = APIRouter()
+
+# 批量写入比赛成绩
+@router.post("/ingest", response_model=BaseResponse[RaceRecordBatchResponse], summary="批量写入比赛成绩")
+async def ingest_race_records(
+    data: RaceRecordBatchRequest,
+    auth: AuthContext = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await ingest_race_records_service(db, data.records)
+    return BaseResponse.success(token=auth.new_token, message=f"成功写入{result.inserted}条成绩", data=result)
+
+
+# 从 race_records 重建赛道排行榜
+@router.post("/rebuild_leaderboard", response_model=BaseResponse[None], summary="重建赛道排行榜")
+async def rebuild_leaderboard(
+    track_id: str,
+    auth: AuthContext = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    await rebuild_track_leaderboard_service(db, track_id)
+    return BaseResponse.success(token=auth.new_token, message=f"成功重建排行榜:{track_id}", data=None)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from app.schemas.base import BaseResponse
+from app.schemas.user import AuthContext
+from app.db.session import get_pool_status
+from app.api.deps import get_current_admin
+
+
+router = APIRouter()
+
+# 当前 worker 的数据库连接池状态
+@router.get("/db_pool", response_model=BaseResponse[dict], summary="数据库连接池状态")
+async def get_db_pool_status(
+    auth: AuthContext = Depends(get_current_admin)
+):
+    return BaseResponse.success(token=auth.new_token, data=get_pool_status())
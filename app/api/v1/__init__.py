@@ -1,7 +1,9 @@
 # app/api/v1/__init__.py
 from fastapi import APIRouter
-from app.api.v1 import user, user_follow
+from app.api.v1 import user, user_follow, leaderboard, competition
 
 router = APIRouter()
 router.include_router(user.router, prefix="/user", tags=["用户"])
-router.include_router(user_follow.router, prefix="/user", tags=["用户关系"])
\ No newline at end of file
+router.include_router(user_follow.router, prefix="/user", tags=["用户关系"])
+router.include_router(leaderboard.router, prefix="/leaderboard", tags=["排行榜"])
+router.include_router(competition.router, prefix="/competition", tags=["比赛"])
\ No newline at end of file
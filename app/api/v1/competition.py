@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user, get_read_db
+from app.schemas.base import BaseResponse
+from app.schemas.user import AuthContext
+from app.schemas.competition import NearbyTrackListResponse, SportType
+from app.services.competition import query_nearby_tracks_service
+from typing import Optional
+
+
+router = APIRouter()
+
+@router.get("/nearby_tracks", response_model=BaseResponse[NearbyTrackListResponse], summary="附近的赛道")
+async def get_nearby_tracks(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=200),
+    sport_type: Optional[SportType] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_current_user)
+):
+    result = await query_nearby_tracks_service(
+        db=db,
+        latitude=latitude,
+        longitude=longitude,
+        radius_km=radius_km,
+        sport_type=sport_type.value if sport_type else None,
+        limit=limit
+    )
+    return BaseResponse.success(token=auth.new_token, message="查询附近赛道成功", data=result)
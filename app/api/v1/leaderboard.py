@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user, get_read_db
+from app.schemas.base import BaseResponse
+from app.schemas.user import AuthContext
+from app.schemas.leaderboard import LeaderboardResponse, LeaderboardMyRankResponse, StandingsResponse
+from app.services.leaderboard import get_track_top_service, get_track_my_rank_service, get_track_around_me_service
+from app.services.standings import get_season_standings_service, get_event_standings_service
+from typing import Optional
+
+
+router = APIRouter()
+
+@router.get("/track/top", response_model=BaseResponse[LeaderboardResponse], summary="赛道排行榜前N名")
+async def get_track_top(
+    track_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_current_user)
+):
+    result = await get_track_top_service(db, track_id, limit)
+    return BaseResponse.success(token=auth.new_token, message="查询排行榜成功", data=result)
+
+
+@router.get("/track/me", response_model=BaseResponse[LeaderboardMyRankResponse], summary="我在赛道排行榜的名次")
+async def get_track_my_rank(
+    track_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_current_user)
+):
+    result = await get_track_my_rank_service(db, track_id, auth.payload["user_id"])
+    return BaseResponse.success(token=auth.new_token, message="查询名次成功", data=result)
+
+
+@router.get("/track/around_me", response_model=BaseResponse[LeaderboardResponse], summary="赛道排行榜中我附近的名次")
+async def get_track_around_me(
+    track_id: str,
+    radius: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_current_user)
+):
+    result = await get_track_around_me_service(db, track_id, auth.payload["user_id"], radius)
+    return BaseResponse.success(token=auth.new_token, message="查询排行榜成功", data=result)
+
+
+@router.get("/season", response_model=BaseResponse[StandingsResponse], summary="赛季积分榜")
+async def get_season_standings(
+    season_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor_score: Optional[float] = Query(None),
+    cursor_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_current_user)
+):
+    result = await get_season_standings_service(db, season_id, limit, cursor_score, cursor_id)
+    return BaseResponse.success(token=auth.new_token, message="查询积分榜成功", data=result)
+
+
+@router.get("/event", response_model=BaseResponse[StandingsResponse], summary="赛事积分榜")
+async def get_event_standings(
+    event_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor_score: Optional[float] = Query(None),
+    cursor_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext = Depends(get_current_user)
+):
+    result = await get_event_standings_service(db, event_id, limit, cursor_score, cursor_id)
+    return BaseResponse.success(token=auth.new_token, message="查询积分榜成功", data=result)
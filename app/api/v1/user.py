@@ -2,15 +2,16 @@ from fastapi import APIRouter, Depends, File, UploadFile, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.services.sms import send_sms_code, verify_sms_code
-from app.services.user import login_or_register, get_user_info, update_user_info, delete_user_info, get_user_by_phone, get_user_role
-from app.services.user_follow import get_relation_count, get_relationship_service
-from app.api.deps import get_current_user
+from app.services.user import login_or_register, get_user_profile, update_user_info, delete_user_info, get_user_by_phone, get_user_role, search_users_service
+from app.services.user_follow import get_relation_count
+from app.services.upload import USER_IMAGE_MAX_BYTES
+from app.services.image import save_image
+from app.api.deps import get_current_user, get_read_db
 from app.core.errors import ErrorCode
 from app.schemas import user as schemas_user
 from app.schemas.base import BaseResponse
+from app.schemas.user_follow import UserSearchResponse
 from typing import Optional
-from pathlib import Path
-from datetime import datetime
 
 
 router = APIRouter()
@@ -26,22 +27,22 @@ async def login(data: schemas_user.SMSCodeVerify, db: AsyncSession = Depends(get
     if not await verify_sms_code(data.phone_number, data.code):
         return BaseResponse.error(code=ErrorCode.SMS_CODE_WRONG, message="验证码错误")
     token, user, isRegister, role = await login_or_register(data.phone_number, db)
-    relation = await get_relation_count(db, user.user_id)
+    # 新注册用户的关系计数必为 0，无需查询
+    relation = schemas_user.UserRelationInfo() if isRegister else await get_relation_count(db, user.user_id)
     return BaseResponse.success(token=token, message="登录成功", data=schemas_user.LoginResponse(user=user, relation=relation, role=role, isRegister=isRegister))
 
 @router.get("/me", response_model=BaseResponse[schemas_user.UserMeResponse], summary="获取当前用户信息")
 async def get_me(
     auth: schemas_user.AuthContext=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    user = await get_user_info(auth.payload["user_id"], db)
-    relation = await get_relation_count(db, auth.payload["user_id"])
+    user, relation, _ = await get_user_profile(auth.payload["user_id"], db)
     return BaseResponse.success(token=auth.new_token, message="成功获取我的信息", data=schemas_user.UserMeResponse(user=user, relation=relation))
 
 @router.get("/me/role", response_model=BaseResponse[schemas_user.UserRole], summary="获取当前用户权限")
 async def get_me_role(
     auth: schemas_user.AuthContext=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     role = await get_user_role(auth.payload["user_id"], db)
     return BaseResponse.success(token=auth.new_token, message="成功获取我的权限", data=role)
@@ -50,15 +51,24 @@ async def get_me_role(
 async def get_anyone(
     user_id: str,
     my_id: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
+):
+    user, relation, relationship = await get_user_profile(user_id, db, viewer_id=my_id)
+    return BaseResponse.success(message="成功获取用户信息", data=schemas_user.UserAnyResponse(user=user, relation=relation, relationship=relationship))
+
+@router.get("/search", response_model=BaseResponse[UserSearchResponse], summary="按昵称搜索用户")
+async def search_user(
+    keyword: str = Query(..., min_length=1),
+    limit: int = Query(20, le=100),
+    cursor_id: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    user = await get_user_info(user_id, db)
-    relation = await get_relation_count(db, user_id)
-    if my_id:
-        relationship = await get_relationship_service(db, my_id, user_id)
-        return BaseResponse.success(message="成功获取用户信息", data=schemas_user.UserAnyResponse(user=user, relation=relation, relationship=relationship))
-    else:
-        return BaseResponse.success(message="成功获取用户信息", data=schemas_user.UserAnyResponse(user=user, relation=relation, relationship=schemas_user.RelationshipStatus.none))
+    users, next_cursor_id, has_more = await search_users_service(keyword, db, limit=limit, cursor_id=cursor_id)
+    return BaseResponse.success(message="搜索用户成功", data=UserSearchResponse(
+        users=users,
+        next_cursor_id=next_cursor_id,
+        has_more=has_more
+    ))
 
 @router.post("/update", response_model=BaseResponse[schemas_user.UserBaseInfoResponse], summary="更新当前用户信息")
 async def update_me(
@@ -72,31 +82,11 @@ async def update_me(
     avatar_url = "/resources/placeholder/avatar.png"
     background_url = "/resources/placeholder/background.png"
 
-    # 更新图片资源
-    user_folder = Path("resources/user") / user_id
-    user_folder.mkdir(parents=True, exist_ok=True)
+    # 更新图片资源（按内容寻址存储，旧图片由 gc_image_blobs 统一回收）
     if avatar_image:
-        # 删除旧头像
-        for file in user_folder.glob("avatar_*.jpg"):
-            file.unlink(missing_ok=True)
-        avatar_path = user_folder / f"avatar_{int(datetime.now().timestamp())}.jpg"
-        contents = await avatar_image.read()
-        if len(contents) > 1 * 1024 * 1024:  # 超过 1MB
-            return BaseResponse.error(status_code=ErrorCode.IMAGE_UPLOAD_OVERSIZE, detail="上传图片体积超过限制")
-        with avatar_path.open("wb") as f:
-            f.write(contents)
-        avatar_url = f"/resources/user/{user_id}/{avatar_path.name}"
+        avatar_url = await save_image(avatar_image, max_bytes=USER_IMAGE_MAX_BYTES)
     if background_image:
-        # 删除旧背景图
-        for file in user_folder.glob("background_*.jpg"):
-            file.unlink(missing_ok=True)
-        bg_path = user_folder / f"background_{int(datetime.now().timestamp())}.jpg"
-        contents = await background_image.read()
-        if len(contents) > 1 * 1024 * 1024:  # 超过 1MB
-            return BaseResponse.error(status_code=ErrorCode.IMAGE_UPLOAD_OVERSIZE, detail="上传图片体积超过限制")
-        with bg_path.open("wb") as f:
-            f.write(contents)
-        background_url = f"/resources/user/{user_id}/{bg_path.name}"
+        background_url = await save_image(background_image, max_bytes=USER_IMAGE_MAX_BYTES)
     
     user = await update_user_info(user_id, form, avatar_url, background_url, db)
     return BaseResponse.success(token=auth.new_token, message="成功修改我的信息", data=schemas_user.UserBaseInfoResponse(user=user))
@@ -3,9 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.services.user_follow import get_following_list, get_follower_list, get_friend_list, follow_user, cancel_follow_user, get_relationship_service, get_relation_count
-from app.schemas.user_follow import RelationListResponse, PersonInfoResponse
+from app.api.deps import get_current_user, get_read_db
+from app.services.user_follow import get_following_list, get_follower_list, get_friend_list, follow_user, cancel_follow_user, get_relationship_service, get_relationships_service, get_relation_count
+from app.schemas.user_follow import RelationListResponse, PersonInfoResponse, RelationshipBatchRequest, RelationshipBatchResponse
 from app.schemas.base import BaseResponse
 from app.schemas.user import AuthContext, UserRelationInfo, RelationshipStatus
 import uuid
@@ -16,17 +16,27 @@ router = APIRouter()
 @router.get("/relationship", response_model=BaseResponse[RelationshipStatus], summary="关注某用户")
 async def get_relationship(
     user_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     auth: AuthContext=Depends(get_current_user)
 ):
     relationship = await get_relationship_service(db, auth.payload["user_id"], user_id)
     return BaseResponse.success(token=auth.new_token, message="查询关系成功", data=relationship)
 
 
+@router.post("/relationships", response_model=BaseResponse[RelationshipBatchResponse], summary="批量查询与多个用户的关系")
+async def get_relationships(
+    data: RelationshipBatchRequest,
+    db: AsyncSession = Depends(get_read_db),
+    auth: AuthContext=Depends(get_current_user)
+):
+    relationships = await get_relationships_service(db, auth.payload["user_id"], data.user_ids)
+    return BaseResponse.success(token=auth.new_token, message="批量查询关系成功", data=RelationshipBatchResponse(relationships=relationships))
+
+
 @router.get("/relation_info", response_model=BaseResponse[UserRelationInfo], summary="获取某用户的各关系数量")
 async def get_relation_info(
     user_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     relation_info = await get_relation_count(db, user_id)
     return BaseResponse.success(message="查询各关系数量成功", data=relation_info)
@@ -61,7 +71,7 @@ async def get_following(
     cursor_created_at: Optional[datetime] = Query(None),
     cursor_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     users, next_cursor_created_at, next_cursor_id, has_more = await get_following_list(db, user_id, limit=limit, cursor_created_at=cursor_created_at, cursor_id=cursor_id, search=search)
     return BaseResponse.success(message="成功获取关注列表", data=RelationListResponse(
@@ -78,7 +88,7 @@ async def get_follower(
     cursor_created_at: Optional[datetime] = Query(None),
     cursor_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     users, next_cursor_created_at, next_cursor_id, has_more = await get_follower_list(db, user_id, limit=limit, cursor_created_at=cursor_created_at, cursor_id=cursor_id, search=search)
     return BaseResponse.success(message="成功获取粉丝列表", data=RelationListResponse(
@@ -95,7 +105,7 @@ async def get_friend(
     cursor_created_at: Optional[datetime] = Query(None),
     cursor_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     users, next_cursor_created_at, next_cursor_id, has_more = await get_friend_list(db, user_id, limit=limit, cursor_created_at=cursor_created_at, cursor_id=cursor_id, search=search)
     return BaseResponse.success(message="成功获取朋友列表", data=RelationListResponse(
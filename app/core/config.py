@@ -1,19 +1,86 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers
 from starlette.requests import Request
+import anyio
 import os
+import stat
+import time
 
 class CustomStaticFiles(StaticFiles):
-    async def get_response(self, path: str, scope) -> FileResponse:
-        response: FileResponse = await super().get_response(path, scope)
-        
-        if path.endswith(".png"):
-            response.headers["Cache-Control"] = "public, max-age=86400"  # 1 day
+    # 静态资源服务：缓存内容寻址图片与占位图的文件元数据避免每次请求都 stat，支持 ETag/Last-Modified 条件请求（304）、
+    # Range 请求（由 FileResponse 处理），客户端接受 WebP 时优先返回同名的 .webp 预编码文件
+    METADATA_TTL_SECONDS = 60
+    METADATA_CACHE_SIZE = 10000
+    WEBP_SOURCE_SUFFIXES = (".png", ".jpg", ".jpeg")
+    IMMUTABLE_PREFIX = "blobs/"
+    PLACEHOLDER_PREFIX = "placeholder/"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # path -> (full_path, stat_result, 过期时间)
+        self._metadata: dict[str, tuple[str, Optional[os.stat_result], float]] = {}
+
+    async def _lookup(self, path: str) -> tuple[str, Optional[os.stat_result]]:
+        # 缓存范围：blobs/ 下的文件内容永不变化；占位图只随部署更新，其 .webp 是否存在的结果也一并缓存。
+        # 其他路径的文件可能被替换或删除，缓存的大小会与实际内容不符，不缓存；
+        # blobs/ 不缓存不存在的结果，刚写入的图片可以立即访问
+        cache_found = path.startswith((self.IMMUTABLE_PREFIX, self.PLACEHOLDER_PREFIX))
+        cache_missing = path.startswith(self.PLACEHOLDER_PREFIX)
+        now = time.monotonic()
+        entry = self._metadata.get(path) if cache_found else None
+        if entry and entry[2] > now:
+            return entry[0], entry[1]
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except (OSError, ValueError):
+            full_path, stat_result = "", None
+        if stat_result and not stat.S_ISREG(stat_result.st_mode):
+            full_path, stat_result = "", None
+        cacheable = cache_found if stat_result else cache_missing
+        if cacheable:
+            if len(self._metadata) >= self.METADATA_CACHE_SIZE:
+                self._metadata.pop(next(iter(self._metadata)))
+            self._metadata[path] = (full_path, stat_result, now + self.METADATA_TTL_SECONDS)
+        else:
+            self._metadata.pop(path, None)
+        return full_path, stat_result
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+        request_headers = Headers(scope=scope)
+
+        headers = {}
+        served_path = path
+        if path.lower().endswith(self.WEBP_SOURCE_SUFFIXES):
+            headers["Vary"] = "Accept"
+            if "image/webp" in request_headers.get("accept", ""):
+                webp_path = os.path.splitext(path)[0] + ".webp"
+                _, webp_stat = await self._lookup(webp_path)
+                if webp_stat:
+                    served_path = webp_path
+
+        full_path, stat_result = await self._lookup(served_path)
+        if not stat_result:
+            # 目录、不存在等情况交给 StaticFiles 处理（404 等）
+            return await super().get_response(path, scope)
+
+        if path.startswith(self.IMMUTABLE_PREFIX):
+            # 内容寻址的图片文件名由内容摘要决定，内容永不变化
+            headers["ETag"] = f'"{os.path.splitext(os.path.basename(path))[0]}"'
+            headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        elif path.endswith(".png"):
+            headers["Cache-Control"] = "public, max-age=86400"  # 1 day
         else:
-            response.headers["Cache-Control"] = "public, max-age=3600"  # 1 hour
-        
+            headers["Cache-Control"] = "public, max-age=3600"  # 1 hour
+
+        response = FileResponse(full_path, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
         return response
 
 
@@ -24,6 +91,19 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 默认 7 天
 
+    # 数据库连接池（每个 uvicorn worker 一个池，总连接数 = worker 数 * (POOL_SIZE + MAX_OVERFLOW)）
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0      # 等待空闲连接的秒数，超时抛错而不是无限排队
+    DB_POOL_RECYCLE: int = 1800        # 连接最长复用秒数
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100.0   # 等待连接超过该毫秒数记为慢获取
+    DB_PGBOUNCER: bool = False         # 经 PgBouncer（transaction 模式）连接时开启，禁用 asyncpg 预编译语句缓存
+
+    # 只读从库（未配置时只读接口也走主库）
+    DATABASE_READ_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: int = 5  # 用户写入后该时长内其只读请求仍走主库，需大于从库复制延迟
+
     class Config:
         env_file = ".env"  # 默认从项目根目录的 .env 文件中读取
         env_file_encoding = "utf-8"
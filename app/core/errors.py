@@ -6,6 +6,8 @@ class ErrorCode:
 
     # 通用
     IMAGE_UPLOAD_OVERSIZE = 1001
+    IMAGE_INVALID = 1002
+    IMPORT_FILE_INVALID = 1003
 
     # 用户相关
     USER_NOT_FOUND = 2001
@@ -28,6 +30,8 @@ class ErrorCode:
     EVENT_NOT_FOUND = 4006
     TRACK_ALREADY_EXIST = 4007
     TRACK_NOT_FOUND = 4008
+    LEADERBOARD_REBUILDING = 4009
+    CATALOG_IMPORT_CONFLICT = 4010
 
     # 第三方服务
     SMS_SERVICE_ERROR = 5001
@@ -1,11 +1,17 @@
-from jose import jwt, JWTError
+from jose import jwt, JWTError, ExpiredSignatureError
 from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+import hashlib
 from app.core.config import settings
 from app.schemas.base import BizException
 from app.core.errors import ErrorCode
 
 ALGORITHM = "HS256"
 TOKEN_REFRESH_THRESHOLD_MINUTES = 24 * 60 * 3   # 不足3天过期则刷新token
+VERIFIED_TOKEN_CACHE_SIZE = 10000   # 进程内已校验token缓存上限
+
+# token摘要 -> {"payload": 解码结果, "exp": 过期时间, "new_token": 已签发的刷新token}
+_verified_tokens: "OrderedDict[str, dict]" = OrderedDict()
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -13,23 +19,40 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
 
+def _cache_verified_token(key: str, entry: dict):
+    _verified_tokens[key] = entry
+    _verified_tokens.move_to_end(key)
+    if len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+
 def verify_token(token: str):
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    key = hashlib.sha256(token.encode()).hexdigest()
+    entry = _verified_tokens.get(key)
+    if entry is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        except ExpiredSignatureError:
+            # 与缓存命中后过期的处理保持一致
+            raise BizException(code=ErrorCode.TOKEN_EXPIRED, message="登录已过期")
+        except JWTError:
+            return None
         exp_timestamp = payload.get("exp")
         if exp_timestamp is None:
             return None
+        entry = {
+            "payload": payload,
+            "exp": datetime.fromtimestamp(exp_timestamp, tz=timezone.utc),
+            "new_token": None
+        }
+    _cache_verified_token(key, entry)
 
-        exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
-        now = datetime.now(timezone.utc)
-        refresh_token = None
-
-        if exp_datetime < now:
-            raise BizException(code=ErrorCode.TOKEN_EXPIRED, message="登录已过期")
+    now = datetime.now(timezone.utc)
+    if entry["exp"] < now:
+        _verified_tokens.pop(key, None)
+        raise BizException(code=ErrorCode.TOKEN_EXPIRED, message="登录已过期")
 
-        if exp_datetime - now < timedelta(minutes=TOKEN_REFRESH_THRESHOLD_MINUTES):
-            refresh_token = create_access_token({k: v for k, v in payload.items() if k != "exp"})
+    # 进入刷新窗口后每个token只签发一次新token，后续请求复用
+    if entry["new_token"] is None and entry["exp"] - now < timedelta(minutes=TOKEN_REFRESH_THRESHOLD_MINUTES):
+        entry["new_token"] = create_access_token({k: v for k, v in entry["payload"].items() if k != "exp"})
 
-        return {"payload": payload, "new_token": refresh_token}
-    except JWTError:
-        return None
+    return {"payload": entry["payload"], "new_token": entry["new_token"]}
@@ -1,10 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, func, tuple_
+from sqlalchemy.exc import IntegrityError
 from app.db.models import Region, Event, Season, Track
 from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.db.search import name_contains
+from app.db.geo import geohash_search_cells, geohash_prefix_filter, haversine_km
 from typing import Optional, List
+from datetime import datetime
+import json
 import uuid
 
+CATALOG_INSERT_CHUNK = 500
+CATALOG_IMPORT_LOCK_KEY = 2020  # pg_advisory_xact_lock 的键，仅用于赛事目录批量导入
+
 
 async def create_season_crud(db: AsyncSession, season: Season) -> Season:
     db.add(season)
@@ -78,33 +87,58 @@ async def update_event_crud(db: AsyncSession, event: Event, update_data: dict):
     await db.refresh(event)
 
 
+async def estimate_row_count(db: AsyncSession, stmt) -> int:
+    # 使用查询计划的行数估算代替 COUNT(*)
+    compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 async def query_events_crud(
     db: AsyncSession,
     season_name: Optional[str],
     region_name: Optional[str],
     sport_type: Optional[str],
     event_name: Optional[str],
-    page: int,
-    size: int
-) -> List[Event]:
+    size: int,
+    page: Optional[int] = None,
+    cursor_created_at: Optional[datetime] = None,
+    cursor_id: Optional[str] = None,
+    with_total: bool = False
+) -> tuple[List[Event], bool, Optional[int]]:
     stmt = select(Event).options(
         selectinload(Event.region),
         selectinload(Event.season)
     ).join(Event.region).join(Event.season)
 
     if season_name:
-        stmt = stmt.filter(func.lower(Season.name).contains(season_name.lower()))
+        stmt = stmt.filter(name_contains(Season.name, season_name))
     if region_name:
-        stmt = stmt.filter(func.lower(Region.name).contains(region_name.lower()))
+        stmt = stmt.filter(name_contains(Region.name, region_name))
     if sport_type:
-        stmt = stmt.filter(func.lower(Season.sport_type).contains(sport_type.lower()))
+        stmt = stmt.filter(name_contains(Season.sport_type, sport_type))
     if event_name:
-        stmt = stmt.filter(func.lower(Event.name).contains(event_name.lower()))
+        stmt = stmt.filter(name_contains(Event.name, event_name))
+
+    total = await estimate_row_count(db, stmt) if with_total else None
 
-    stmt = stmt.order_by(Event.created_at.asc()).offset((page - 1) * size).limit(size)
+    # 优先使用 (created_at, event_id) 游标分页，page 仅为兼容旧调用保留
+    if cursor_created_at and cursor_id:
+        stmt = stmt.filter(tuple_(Event.created_at, Event.event_id) > (cursor_created_at, cursor_id))
+    elif cursor_created_at:
+        stmt = stmt.filter(Event.created_at > cursor_created_at)
+    elif page:
+        stmt = stmt.offset((page - 1) * size)
+
+    stmt = stmt.order_by(Event.created_at.asc(), Event.event_id.asc()).limit(size + 1)
 
     result = await db.execute(stmt)
-    return result.scalars().all()
+    events = list(result.scalars().all())
+    return events[:size], len(events) > size, total
 
 
 async def get_track_by_track_id(db: AsyncSession, track_id: str) -> Track | None:
@@ -145,26 +179,111 @@ async def query_tracks_crud(
     season_name: Optional[str],
     region_name: Optional[str],
     sport_type: Optional[str],
-    page: int,
-    size: int
-) -> List[Track]:
+    size: int,
+    page: Optional[int] = None,
+    cursor_created_at: Optional[datetime] = None,
+    cursor_id: Optional[str] = None,
+    with_total: bool = False
+) -> tuple[List[Track], bool, Optional[int]]:
     stmt = select(Track).options(
         selectinload(Track.event).selectinload(Event.season),
         selectinload(Track.event).selectinload(Event.region)
     ).join(Track.event).join(Event.season).join(Event.region)
 
     if event_name:
-        stmt = stmt.filter(func.lower(Event.name).contains(event_name.lower()))
+        stmt = stmt.filter(name_contains(Event.name, event_name))
     if season_name:
-        stmt = stmt.filter(func.lower(Season.name).contains(season_name.lower()))
+        stmt = stmt.filter(name_contains(Season.name, season_name))
     if region_name:
-        stmt = stmt.filter(func.lower(Region.name).contains(region_name.lower()))
+        stmt = stmt.filter(name_contains(Region.name, region_name))
     if sport_type:
-        stmt = stmt.filter(func.lower(Season.sport_type).contains(sport_type.lower()))
+        stmt = stmt.filter(name_contains(Season.sport_type, sport_type))
     if track_name:
-        stmt = stmt.filter(func.lower(Track.name).contains(track_name.lower()))
+        stmt = stmt.filter(name_contains(Track.name, track_name))
+
+    total = await estimate_row_count(db, stmt) if with_total else None
 
-    stmt = stmt.order_by(Track.created_at.asc()).offset((page - 1) * size).limit(size)
+    # 优先使用 (created_at, track_id) 游标分页，page 仅为兼容旧调用保留
+    if cursor_created_at and cursor_id:
+        stmt = stmt.filter(tuple_(Track.created_at, Track.track_id) > (cursor_created_at, cursor_id))
+    elif cursor_created_at:
+        stmt = stmt.filter(Track.created_at > cursor_created_at)
+    elif page:
+        stmt = stmt.offset((page - 1) * size)
+
+    stmt = stmt.order_by(Track.created_at.asc(), Track.track_id.asc()).limit(size + 1)
 
     result = await db.execute(stmt)
-    return result.scalars().all()
\ No newline at end of file
+    tracks = list(result.scalars().all())
+    return tracks[:size], len(tracks) > size, total
+
+
+async def query_nearby_tracks_crud(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    radius_km: float,
+    sport_type: Optional[str],
+    limit: int
+) -> List[tuple[Track, float]]:
+    # 先用 geohash 前缀（覆盖半径的 9 个格子）走索引筛出候选，再按球面距离精确过滤并排序
+    cells = geohash_search_cells(lat, lng, radius_km)
+    distance = haversine_km(Track.from_lat, Track.from_lng, lat, lng).label("distance_km")
+    stmt = select(Track, distance).options(
+        selectinload(Track.event).selectinload(Event.season),
+        selectinload(Track.event).selectinload(Event.region)
+    ).where(geohash_prefix_filter(Track.from_geohash, cells))
+
+    if sport_type:
+        stmt = stmt.join(Track.event).join(Event.season).filter(Season.sport_type == sport_type)
+
+    stmt = stmt.where(distance <= radius_km).order_by(distance).limit(limit)
+    result = await db.execute(stmt)
+    return [(row[0], row[1]) for row in result.all()]
+
+
+async def get_seasons_by_name_and_sport_type(db: AsyncSession, keys: list[tuple[str, str]]) -> dict[tuple[str, str], uuid.UUID]:
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(Season.name, Season.sport_type, Season.id).where(tuple_(Season.name, Season.sport_type).in_(keys))
+    )
+    return {(row.name, row.sport_type): row.id for row in result.all()}
+
+
+async def get_region_ids_by_names(db: AsyncSession, names: list[str]) -> dict[str, uuid.UUID]:
+    if not names:
+        return {}
+    result = await db.execute(select(Region.name, Region.id).where(Region.name.in_(names)))
+    return {row.name: row.id for row in result.all()}
+
+
+async def get_event_ids_by_names(db: AsyncSession, names: list[str]) -> dict[str, uuid.UUID]:
+    if not names:
+        return {}
+    result = await db.execute(select(Event.name, Event.id).where(Event.name.in_(names)))
+    return {row.name: row.id for row in result.all()}
+
+
+async def get_existing_track_names(db: AsyncSession, names: list[str]) -> set[str]:
+    if not names:
+        return set()
+    result = await db.execute(select(Track.name).where(Track.name.in_(names)))
+    return set(result.scalars().all())
+
+
+async def lock_catalog_import(db: AsyncSession):
+    # 事务级 advisory lock 串行化批量导入，名称查重到插入提交之间不会被并发导入穿插，提交或回滚时自动释放
+    await db.execute(select(func.pg_advisory_xact_lock(CATALOG_IMPORT_LOCK_KEY)))
+
+
+async def bulk_create_catalog_crud(db: AsyncSession, seasons: list[dict], events: list[dict], tracks: list[dict]):
+    # 按外键依赖顺序分批多行插入（asyncpg 单条语句最多 32767 个参数），同一事务提交；唯一约束冲突时回滚并抛出 IntegrityError
+    try:
+        for model, rows in ((Season, seasons), (Event, events), (Track, tracks)):
+            for i in range(0, len(rows), CATALOG_INSERT_CHUNK):
+                await db.execute(pg_insert(model).values(rows[i:i + CATALOG_INSERT_CHUNK]))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
@@ -0,0 +1,52 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.db.models import RaceRecord, Track, Event, User
+import uuid
+
+RACE_RECORD_STATUS_FINISHED = "已完成"
+
+
+async def get_user_db_ids(db: AsyncSession, user_ids: list[str]) -> dict[str, uuid.UUID]:
+    result = await db.execute(select(User.user_id, User.id).where(User.user_id.in_(user_ids)))
+    return {row.user_id: row.id for row in result.all()}
+
+
+async def get_track_refs(db: AsyncSession, track_ids: list[str]) -> dict[str, tuple[uuid.UUID, uuid.UUID, uuid.UUID]]:
+    # track_id -> (tracks.id, events.id, seasons.id)，一次查询解析赛道所属赛事和赛季
+    result = await db.execute(
+        select(Track.track_id, Track.id, Track.event_id, Event.season_id)
+        .join(Event, Event.id == Track.event_id)
+        .where(Track.track_id.in_(track_ids))
+    )
+    return {row.track_id: (row.id, row.event_id, row.season_id) for row in result.all()}
+
+
+async def bulk_insert_race_records(db: AsyncSession, rows: list[dict]):
+    # 多行 INSERT ... ON CONFLICT DO NOTHING，返回实际写入的记录
+    if not rows:
+        return []
+    stmt = pg_insert(RaceRecord).values(rows).on_conflict_do_nothing(
+        constraint="uq_race_record_user_track_start"
+    ).returning(
+        RaceRecord.id, RaceRecord.user_id, RaceRecord.track_id,
+        RaceRecord.event_id, RaceRecord.season_id,
+        RaceRecord.score, RaceRecord.duration_seconds
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_best_durations_by_track(db: AsyncSession, track_db_id: uuid.UUID) -> list[tuple[str, float]]:
+    # 每个用户在该赛道的最好用时，用于重建排行榜
+    result = await db.execute(
+        select(User.user_id, func.min(RaceRecord.duration_seconds))
+        .join(User, User.id == RaceRecord.user_id)
+        .where(
+            RaceRecord.track_id == track_db_id,
+            RaceRecord.status == RACE_RECORD_STATUS_FINISHED,
+            RaceRecord.duration_seconds.isnot(None)
+        )
+        .group_by(User.user_id)
+    )
+    return [(row[0], row[1]) for row in result.all()]
@@ -0,0 +1,140 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, tuple_, or_, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.db.models import UserTrackBest, SeasonStanding, EventStanding, RaceRecord, User
+from app.crud.race_record import RACE_RECORD_STATUS_FINISHED
+from typing import Optional
+import uuid
+
+
+async def _bump_standings(db: AsyncSession, model, owner_col: str, deltas: dict):
+    # deltas: (owner_id, user_id) -> (score_delta, track_delta)，ON CONFLICT 累加
+    if not deltas:
+        return
+    stmt = pg_insert(model).values([
+        {owner_col: owner_id, "user_id": user_id, "total_score": score, "track_count": tracks}
+        for (owner_id, user_id), (score, tracks) in sorted(deltas.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[owner_col, "user_id"],
+        set_={
+            "total_score": model.total_score + stmt.excluded.total_score,
+            "track_count": model.track_count + stmt.excluded.track_count,
+            "updated_at": func.now()
+        }
+    )
+    await db.execute(stmt)
+
+
+async def apply_record_scores(db: AsyncSession, records):
+    # records 为刚写入的成绩行（需含 user_id/track_id/event_id/season_id/score），不提交事务，由调用方与成绩写入一起提交
+    best: dict[tuple[uuid.UUID, uuid.UUID], tuple[uuid.UUID, uuid.UUID, float]] = {}
+    for r in records:
+        if r.score is None:
+            continue
+        key = (r.user_id, r.track_id)
+        if key not in best or r.score > best[key][2]:
+            best[key] = (r.event_id, r.season_id, r.score)
+    if not best:
+        return
+
+    pairs = sorted(best)
+    # 先插入占位行再 FOR UPDATE 锁定，保证并发批次对同一 (用户, 赛道) 的差值计算串行
+    await db.execute(
+        pg_insert(UserTrackBest).values([
+            {"user_id": user_id, "track_id": track_id, "event_id": best[(user_id, track_id)][0], "season_id": best[(user_id, track_id)][1]}
+            for user_id, track_id in pairs
+        ]).on_conflict_do_nothing(index_elements=["user_id", "track_id"])
+    )
+    result = await db.execute(
+        select(UserTrackBest.user_id, UserTrackBest.track_id, UserTrackBest.best_score)
+        .where(tuple_(UserTrackBest.user_id, UserTrackBest.track_id).in_(pairs))
+        .order_by(UserTrackBest.user_id, UserTrackBest.track_id)
+        .with_for_update()
+    )
+    current = {(row.user_id, row.track_id): row.best_score for row in result.all()}
+
+    improved = []
+    season_deltas: dict = {}
+    event_deltas: dict = {}
+    for key in pairs:
+        event_id, season_id, score = best[key]
+        old = current.get(key)
+        if old is not None and score <= old:
+            continue
+        improved.append({"user_id": key[0], "track_id": key[1], "event_id": event_id, "season_id": season_id, "best_score": score})
+        delta = (score - (old or 0), 1 if old is None else 0)
+        for deltas, owner_id in ((season_deltas, season_id), (event_deltas, event_id)):
+            prev = deltas.get((owner_id, key[0]), (0, 0))
+            deltas[(owner_id, key[0])] = (prev[0] + delta[0], prev[1] + delta[1])
+    if not improved:
+        return
+
+    stmt = pg_insert(UserTrackBest).values(improved)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "track_id"],
+        set_={"best_score": stmt.excluded.best_score, "updated_at": func.now()}
+    )
+    await db.execute(stmt)
+    await _bump_standings(db, SeasonStanding, "season_id", season_deltas)
+    await _bump_standings(db, EventStanding, "event_id", event_deltas)
+
+
+async def rebuild_standings(db: AsyncSession):
+    # 从 race_records 全量重算三张汇总表，用于初始化或修复
+    await db.execute(delete(SeasonStanding))
+    await db.execute(delete(EventStanding))
+    await db.execute(delete(UserTrackBest))
+
+    bests = select(
+        RaceRecord.user_id, RaceRecord.track_id, RaceRecord.event_id, RaceRecord.season_id,
+        func.max(RaceRecord.score)
+    ).where(
+        RaceRecord.status == RACE_RECORD_STATUS_FINISHED,
+        RaceRecord.score.isnot(None)
+    ).group_by(RaceRecord.user_id, RaceRecord.track_id, RaceRecord.event_id, RaceRecord.season_id)
+    await db.execute(pg_insert(UserTrackBest).from_select(
+        ["user_id", "track_id", "event_id", "season_id", "best_score"], bests
+    ))
+
+    for model, owner_col in ((SeasonStanding, UserTrackBest.season_id), (EventStanding, UserTrackBest.event_id)):
+        source = select(owner_col, UserTrackBest.user_id, func.sum(UserTrackBest.best_score), func.count()) \
+            .group_by(owner_col, UserTrackBest.user_id)
+        await db.execute(pg_insert(model).from_select(
+            [owner_col.key, "user_id", "total_score", "track_count"], source
+        ))
+    await db.commit()
+
+
+async def _get_standings_page(
+    db: AsyncSession,
+    model,
+    owner_col,
+    owner_id: uuid.UUID,
+    limit: int,
+    cursor_score: Optional[float] = None,
+    cursor_user_db_id: Optional[uuid.UUID] = None
+):
+    # 按 (total_score DESC, user_id ASC) 游标分页，命中 (owner, total_score DESC, user_id) 索引
+    stmt = select(User, model.total_score, model.track_count) \
+        .join(User, User.id == model.user_id) \
+        .where(owner_col == owner_id)
+    if cursor_score is not None and cursor_user_db_id is not None:
+        stmt = stmt.where(or_(
+            model.total_score < cursor_score,
+            and_(model.total_score == cursor_score, model.user_id > cursor_user_db_id)
+        ))
+    elif cursor_score is not None:
+        stmt = stmt.where(model.total_score < cursor_score)
+    stmt = stmt.order_by(model.total_score.desc(), model.user_id.asc()).limit(limit + 1)
+    result = await db.execute(stmt)
+    rows = result.all()
+    return rows[:limit], len(rows) > limit
+
+
+async def get_season_standings(db: AsyncSession, season_db_id: uuid.UUID, limit: int, cursor_score=None, cursor_user_db_id=None):
+    return await _get_standings_page(db, SeasonStanding, SeasonStanding.season_id, season_db_id, limit, cursor_score, cursor_user_db_id)
+
+
+async def get_event_standings(db: AsyncSession, event_db_id: uuid.UUID, limit: int, cursor_score=None, cursor_user_db_id=None):
+    return await _get_standings_page(db, EventStanding, EventStanding.event_id, event_db_id, limit, cursor_score, cursor_user_db_id)
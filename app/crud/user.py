@@ -1,43 +1,97 @@
 from sqlalchemy.future import select
+from sqlalchemy import cast, func, literal, String, BigInteger
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.models import User
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.db.models import User, user_id_seq
+from app.db.search import name_contains
 import uuid
-import time
-import random
 from typing import Optional
 
+# user_id = "1" + lpad(序号 * USER_ID_MULTIPLIER mod 10^10, 10)，乘数与 10^10 互素，序号到 user_id 一一对应，
+# 不会重复，只是让相邻注册的 id 看起来不连续（映射可逆，并不隐藏注册顺序）；11 位长度与旧的 15 位时间戳 id 不会冲突
+USER_ID_MODULUS = 10 ** 10
+USER_ID_MULTIPLIER = 7654321987
+USER_CREATE_MAX_ATTEMPTS = 5
+
+# 会话级 user_id -> User 缓存，生命周期与 get_db 提供的 AsyncSession 一致，
+# 同一请求内对同一用户只查一次 users 表（不缓存不存在的用户）
+def _user_identity_map(db: AsyncSession) -> dict[str, User]:
+    return db.info.setdefault("users_by_user_id", {})
+
 async def get_user_by_phone(db: AsyncSession, phone_number: str):
     result = await db.execute(select(User).where(User.phone_number == phone_number))
-    return result.scalar_one_or_none()
+    user = result.scalar_one_or_none()
+    if user:
+        _user_identity_map(db)[user.user_id] = user
+    return user
 
 async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+    users = _user_identity_map(db)
+    if user_id in users:
+        return users[user_id]
     result = await db.execute(select(User).where(User.user_id == user_id))
-    return result.scalar_one_or_none()
+    user = result.scalar_one_or_none()
+    if user:
+        users[user_id] = user
+    return user
+
+async def get_users_by_ids(db: AsyncSession, user_ids: list[str]) -> dict[str, User]:
+    # 批量解析，只查询缓存中没有的 user_id
+    users = _user_identity_map(db)
+    missing = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in users]
+    if missing:
+        result = await db.execute(select(User).where(User.user_id.in_(missing)))
+        for user in result.scalars().all():
+            users[user.user_id] = user
+    return {user_id: users[user_id] for user_id in user_ids if user_id in users}
+
+async def search_users(
+        db: AsyncSession,
+        keyword: str,
+        limit: int = 20,
+        cursor_id: Optional[str] = None
+    ) -> tuple[list[User], Optional[str], bool]:
+    # 昵称子串匹配走 users.nickname 的 trigram 索引，按 user_id 游标分页
+    query = select(User).where(name_contains(User.nickname, keyword))
+    if cursor_id:
+        query = query.where(User.user_id > cursor_id)
+    query = query.order_by(User.user_id).limit(limit + 1)
+    result = await db.execute(query)
+    users = list(result.scalars().all())
+    has_more = len(users) > limit
+    users = users[:limit]
+    return users, users[-1].user_id if users else None, has_more
 
 async def delete_user_by_id(db: AsyncSession, user: User):
+    _user_identity_map(db).pop(user.user_id, None)
     await db.delete(user)
     await db.commit()
 
-async def generate_unique_user_id(db: AsyncSession) -> str:
-    while True:
-        user_id = f"{int(time.time())}{random.randint(10000, 99999)}"
-        existing_user = await get_user_by_id(db, user_id)
-        if not existing_user:
-            return user_id
-
-async def create_user(db: AsyncSession, phone_number: str):
-    user_id = await generate_unique_user_id(db)
-    user = User(
-        user_id=user_id,
-        nickname=f"新用户_{user_id[-5:]}",
-        phone_number=phone_number,
-        avatar_image_url="/resources/placeholder/avatar.png",
-        background_image_url="/resources/placeholder/background.png"
-    )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    return user
+async def create_user(db: AsyncSession, phone_number: str) -> Optional[User]:
+    # 单条 INSERT ... ON CONFLICT DO NOTHING RETURNING 完成注册，手机号已被并发注册时返回 None
+    # 默认昵称可能已被其他用户改名占用（nickname 唯一），此时换下一个序号重试
+    seq = select(user_id_seq.next_value().label("n")).subquery()
+    digits = func.lpad(cast((seq.c.n * literal(USER_ID_MULTIPLIER, BigInteger)) % literal(USER_ID_MODULUS, BigInteger), String), 10, "0")
+    stmt = pg_insert(User).from_select(
+        ["user_id", "nickname", "phone_number", "avatar_image_url", "background_image_url"],
+        select(
+            literal("1") + digits,
+            literal("新用户_") + digits,
+            literal(phone_number),
+            literal("/resources/placeholder/avatar.png"),
+            literal("/resources/placeholder/background.png")
+        )
+    ).on_conflict_do_nothing().returning(User)
+    for _ in range(USER_CREATE_MAX_ATTEMPTS):
+        result = await db.scalars(stmt)
+        user = result.first()
+        await db.commit()
+        if user:
+            _user_identity_map(db)[user.user_id] = user
+            return user
+        if await get_user_by_phone(db, phone_number):
+            return None
+    return None
 
 async def update_user(db: AsyncSession, user: User, data: dict):
     for key, value in data.items():
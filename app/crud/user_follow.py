@@ -1,75 +1,191 @@
 from typing import Optional
 from datetime import datetime
-from sqlalchemy import select, delete, and_, or_, desc, asc, func
+from sqlalchemy import select, delete, exists, and_, or_, desc, asc, func, false
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.models import UserFollow, User
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.db.models import UserFollow, User, UserRelationCount
+from app.db.search import name_contains
 from app.schemas.user import RelationshipStatus
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 import uuid
 
+RELATION_COUNT_REBUILD_BATCH = 1000
 
-async def count_following(db: AsyncSession, user_db_id):
-    friend_ids = await get_friend_id_set(db, user_db_id)
-    query = select(func.count()).select_from(UserFollow).where(UserFollow.follower_id == user_db_id)
-    if friend_ids:
-        query = query.where(UserFollow.followed_id.notin_(friend_ids))
-    result = await db.execute(query)
-    return result.scalar()
-
-async def count_followers(db: AsyncSession, user_db_id):
-    friend_ids = await get_friend_id_set(db, user_db_id)
-    query = select(func.count()).select_from(UserFollow).where(UserFollow.followed_id == user_db_id)
-    if friend_ids:
-        query = query.where(UserFollow.follower_id.notin_(friend_ids))
-    result = await db.execute(query)
-    return result.scalar()
 
-async def count_friends(db: AsyncSession, user_db_id):
-    # 互相关注
-    subq1 = select(UserFollow.followed_id).where(UserFollow.follower_id == user_db_id).subquery()
-    subq2 = select(UserFollow.follower_id).where(UserFollow.followed_id == user_db_id).subquery()
+async def get_relation_count_row(db: AsyncSession, user_id: str):
+    # 一次按主键查询即可拿到用户的各关系计数，计数行不存在（从未有过关注关系）时计数列为 None
     result = await db.execute(
-        select(func.count())
-        .select_from(subq1.join(subq2, subq1.c.followed_id == subq2.c.follower_id))
+        select(
+            User.id,
+            UserRelationCount.following_count,
+            UserRelationCount.follower_count,
+            UserRelationCount.friend_count
+        )
+        .outerjoin(UserRelationCount, UserRelationCount.user_id == User.id)
+        .where(User.user_id == user_id)
+    )
+    return result.first()
+
+
+async def _bump_relation_counts(db: AsyncSession, deltas: list[dict]):
+    # deltas: [{"user_id": ..., "following_count": +-n, "follower_count": +-n, "friend_count": +-n}]
+    # 按 user_id 顺序加行锁，与 rebuild_relation_counts 的加锁顺序一致，避免死锁
+    stmt = pg_insert(UserRelationCount).values(sorted(deltas, key=lambda d: d["user_id"]))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserRelationCount.user_id],
+        set_={
+            "following_count": UserRelationCount.following_count + stmt.excluded.following_count,
+            "follower_count": UserRelationCount.follower_count + stmt.excluded.follower_count,
+            "friend_count": UserRelationCount.friend_count + stmt.excluded.friend_count,
+            "updated_at": func.now()
+        }
+    )
+    await db.execute(stmt)
+
+
+async def _lock_relation_count_rows(db: AsyncSession, user_db_ids: list[uuid.UUID]):
+    # 先补齐缺失的计数行再按 user_id 顺序 FOR UPDATE，之后的重算语句能看到加锁前已提交的全部关注，
+    # 尚未提交的关注/取关会阻塞在计数行上，待重算提交后再叠加增量
+    await db.execute(
+        pg_insert(UserRelationCount)
+        .values([{"user_id": user_db_id, "following_count": 0, "follower_count": 0, "friend_count": 0} for user_db_id in user_db_ids])
+        .on_conflict_do_nothing(index_elements=[UserRelationCount.user_id])
+    )
+    await db.execute(
+        select(UserRelationCount.user_id)
+        .where(UserRelationCount.user_id.in_(user_db_ids))
+        .order_by(UserRelationCount.user_id)
+        .with_for_update()
     )
-    return result.scalar()
+
+
+async def _recount_relation_counts(db: AsyncSession, user_db_ids: list[uuid.UUID]):
+    following_q = select(UserFollow.follower_id.label("user_id"), func.count().label("cnt")) \
+        .where(UserFollow.follower_id.in_(user_db_ids)).group_by(UserFollow.follower_id).subquery()
+    follower_q = select(UserFollow.followed_id.label("user_id"), func.count().label("cnt")) \
+        .where(UserFollow.followed_id.in_(user_db_ids)).group_by(UserFollow.followed_id).subquery()
+    fa = aliased(UserFollow)
+    fb = aliased(UserFollow)
+    friend_q = select(fa.follower_id.label("user_id"), func.count().label("cnt")).join(
+        fb, and_(fb.follower_id == fa.followed_id, fb.followed_id == fa.follower_id)
+    ).where(fa.follower_id.in_(user_db_ids)).group_by(fa.follower_id).subquery()
+
+    friend_cnt = func.coalesce(friend_q.c.cnt, 0)
+    source = select(
+        User.id,
+        func.coalesce(following_q.c.cnt, 0) - friend_cnt,
+        func.coalesce(follower_q.c.cnt, 0) - friend_cnt,
+        friend_cnt
+    ).where(User.id.in_(user_db_ids)) \
+        .outerjoin(following_q, following_q.c.user_id == User.id) \
+        .outerjoin(follower_q, follower_q.c.user_id == User.id) \
+        .outerjoin(friend_q, friend_q.c.user_id == User.id)
+
+    stmt = pg_insert(UserRelationCount).from_select(
+        ["user_id", "following_count", "follower_count", "friend_count"], source
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserRelationCount.user_id],
+        set_={
+            "following_count": stmt.excluded.following_count,
+            "follower_count": stmt.excluded.follower_count,
+            "friend_count": stmt.excluded.friend_count,
+            "updated_at": func.now()
+        }
+    )
+    await db.execute(stmt)
+
+
+async def _rebuild_relation_count_batch(db: AsyncSession, user_db_ids: list[uuid.UUID]):
+    await _lock_relation_count_rows(db, user_db_ids)
+    await _recount_relation_counts(db, user_db_ids)
+    await db.commit()
+
+
+async def rebuild_relation_counts(db: AsyncSession, user_db_ids: Optional[list[uuid.UUID]] = None):
+    # 从 user_follows 全量（或按用户）重算计数，用于修复并发写入造成的计数漂移；
+    # 按 user_id 分批，每批一个事务，计数行只在该批重算期间被锁住
+    if user_db_ids is not None:
+        ids = sorted(set(user_db_ids))
+        for i in range(0, len(ids), RELATION_COUNT_REBUILD_BATCH):
+            await _rebuild_relation_count_batch(db, ids[i:i + RELATION_COUNT_REBUILD_BATCH])
+        return
+    last_id = None
+    while True:
+        query = select(User.id).order_by(User.id).limit(RELATION_COUNT_REBUILD_BATCH)
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        batch = list((await db.execute(query)).scalars().all())
+        if not batch:
+            break
+        await _rebuild_relation_count_batch(db, batch)
+        last_id = batch[-1]
+
+
+async def _lock_follow_pair(db: AsyncSession, user_a: uuid.UUID, user_b: uuid.UUID):
+    # 同一对用户的关注/取关串行执行：互相关注并发时，后执行的一方必然看到对方已提交的关注并按朋友计数。
+    # 对反向关注行 SELECT ... FOR UPDATE 不够，对方尚未提交的插入对本事务不可见，不会阻塞
+    low, high = sorted((str(user_a), str(user_b)))
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(f"user_follow:{low}:{high}", 0))))
 
 
 async def create_follow(db: AsyncSession, follower_id: uuid.UUID, followed_id: uuid.UUID):
+    await _lock_follow_pair(db, follower_id, followed_id)
     follow = UserFollow(follower_id=follower_id, followed_id=followed_id)
     db.add(follow)
+    await db.flush()
+    # 计数与关注关系在同一事务中更新
+    if await is_following(db, followed_id, follower_id):
+        # 对方已关注我：对方从我的粉丝、我从对方的关注中移入朋友
+        await _bump_relation_counts(db, [
+            {"user_id": follower_id, "following_count": 0, "follower_count": -1, "friend_count": 1},
+            {"user_id": followed_id, "following_count": -1, "follower_count": 0, "friend_count": 1}
+        ])
+    else:
+        await _bump_relation_counts(db, [
+            {"user_id": follower_id, "following_count": 1, "follower_count": 0, "friend_count": 0},
+            {"user_id": followed_id, "following_count": 0, "follower_count": 1, "friend_count": 0}
+        ])
     await db.commit()
     return follow
 
 async def remove_follow(db: AsyncSession, follower_id: uuid.UUID, followed_id: uuid.UUID):
-    await db.execute(
+    await _lock_follow_pair(db, follower_id, followed_id)
+    result = await db.execute(
         delete(UserFollow).where(
             and_(
                 UserFollow.follower_id == follower_id,
                 UserFollow.followed_id == followed_id
             )
-        )
+        ).returning(UserFollow.id)
     )
+    if result.first() is not None:
+        if await is_following(db, followed_id, follower_id):
+            # 原本是朋友：对方退回为我的粉丝、我退回为对方的关注
+            await _bump_relation_counts(db, [
+                {"user_id": follower_id, "following_count": 0, "follower_count": 1, "friend_count": -1},
+                {"user_id": followed_id, "following_count": 1, "follower_count": 0, "friend_count": -1}
+            ])
+        else:
+            await _bump_relation_counts(db, [
+                {"user_id": follower_id, "following_count": -1, "follower_count": 0, "friend_count": 0},
+                {"user_id": followed_id, "following_count": 0, "follower_count": -1, "friend_count": 0}
+            ])
     await db.commit()
 
 async def get_relationship_crud(db: AsyncSession, follower_id: uuid.UUID, followed_id: uuid.UUID) -> RelationshipStatus:
-    # 是否 follower_id 关注了 followed_id
-    result1 = await db.execute(
-        select(UserFollow).where(
-            UserFollow.follower_id == follower_id,
-            UserFollow.followed_id == followed_id
-        )
-    )
-    follow1 = result1.scalar()
-
-    # 是否 followed_id 关注了 follower_id
-    result2 = await db.execute(
-        select(UserFollow).where(
-            UserFollow.follower_id == followed_id,
-            UserFollow.followed_id == follower_id
+    # 一次查询同时取出两个方向的关注关系
+    result = await db.execute(
+        select(UserFollow.follower_id).where(
+            or_(
+                and_(UserFollow.follower_id == follower_id, UserFollow.followed_id == followed_id),
+                and_(UserFollow.follower_id == followed_id, UserFollow.followed_id == follower_id)
+            )
         )
     )
-    follow2 = result2.scalar()
+    follower_ids = set(result.scalars().all())
+    follow1 = follower_id in follower_ids   # 是否 follower_id 关注了 followed_id
+    follow2 = followed_id in follower_ids   # 是否 followed_id 关注了 follower_id
 
     if follow1 and follow2:
         return RelationshipStatus.friend
@@ -80,6 +196,48 @@ async def get_relationship_crud(db: AsyncSession, follower_id: uuid.UUID, follow
     else:
         return RelationshipStatus.none
 
+async def get_relationships_crud(db: AsyncSession, user_id: str, target_user_ids: list[str]) -> dict[str, RelationshipStatus]:
+    # 一次查询解析目标用户并判断两个方向的关注关系，不存在的目标用户不会出现在结果中
+    me = select(User.id).where(User.user_id == user_id).scalar_subquery()
+    following = exists().where(UserFollow.follower_id == me, UserFollow.followed_id == User.id)
+    followed_by = exists().where(UserFollow.follower_id == User.id, UserFollow.followed_id == me)
+    result = await db.execute(
+        select(User.user_id, following.label("following"), followed_by.label("followed_by"))
+        .where(User.user_id.in_(target_user_ids))
+    )
+    return {row.user_id: relationship_status(row.following, row.followed_by) for row in result.all()}
+
+def relationship_status(following: bool, followed_by: bool) -> RelationshipStatus:
+    if following and followed_by:
+        return RelationshipStatus.friend
+    elif following:
+        return RelationshipStatus.following
+    elif followed_by:
+        return RelationshipStatus.follower
+    else:
+        return RelationshipStatus.none
+
+async def get_user_profile_row(db: AsyncSession, user_id: str, viewer_id: Optional[str] = None):
+    # 一次查询取出用户行、关系计数以及查看者与该用户两个方向的关注关系；计数行不存在时计数列为 None
+    following = followed_by = false()
+    if viewer_id and viewer_id != user_id:
+        viewer = select(User.id).where(User.user_id == viewer_id).scalar_subquery()
+        following = exists().where(UserFollow.follower_id == viewer, UserFollow.followed_id == User.id)
+        followed_by = exists().where(UserFollow.follower_id == User.id, UserFollow.followed_id == viewer)
+    result = await db.execute(
+        select(
+            User,
+            UserRelationCount.following_count,
+            UserRelationCount.follower_count,
+            UserRelationCount.friend_count,
+            following.label("following"),
+            followed_by.label("followed_by")
+        )
+        .outerjoin(UserRelationCount, UserRelationCount.user_id == User.id)
+        .where(User.user_id == user_id)
+    )
+    return result.first()
+
 async def is_following(db: AsyncSession, follower_id: uuid.UUID, followed_id: uuid.UUID) -> bool:
     result = await db.execute(
         select(UserFollow.id).where(
@@ -91,36 +249,37 @@ async def is_following(db: AsyncSession, follower_id: uuid.UUID, followed_id: uu
     )
     return result.scalar_one_or_none() is not None
 
-async def get_friend_id_set(db: AsyncSession, user_id: uuid.UUID) -> set[uuid.UUID]:
-    sub_a = select(UserFollow.followed_id).where(UserFollow.follower_id == user_id).subquery()
-    sub_b = select(UserFollow.follower_id).where(UserFollow.followed_id == user_id).subquery()
-    result = await db.execute(
-        select(sub_a.c.followed_id)
-        .join(sub_b, sub_a.c.followed_id == sub_b.c.follower_id)
-    )
-    return set(result.scalars().all())
-
-
-async def get_following_ids(
-        db: AsyncSession, 
+async def _get_follow_page(
+        db: AsyncSession,
+        owner_col,
+        other_col,
         id: uuid.UUID,
-        limit: int = 20,
-        cursor_created_at: Optional[datetime] = None, 
-        cursor_id: Optional[uuid.UUID] = None,
-        search: Optional[str] = None
+        limit: int,
+        cursor_created_at: Optional[datetime],
+        cursor_id: Optional[uuid.UUID],
+        search: Optional[str]
     ) -> tuple[list[User], Optional[datetime], Optional[str], bool]:
-    friend_ids = await get_friend_id_set(db, id)
-
-    query = select(UserFollow).options(selectinload(UserFollow.followed)).where(UserFollow.follower_id == id)
-    if friend_ids:
-        query = query.where(UserFollow.followed_id.notin_(friend_ids))
+    # owner_col/other_col 为 UserFollow 上的一对列：(follower_id, followed_id) 查关注，(followed_id, follower_id) 查粉丝
+    # 分页、排除朋友、昵称搜索均在数据库内完成，每页只取 limit+1 行
+    reverse = aliased(UserFollow)
+    query = (
+        select(User, UserFollow.created_at)
+        .join(UserFollow, other_col == User.id)
+        .where(owner_col == id)
+        .where(
+            ~exists().where(
+                reverse.follower_id == UserFollow.followed_id,
+                reverse.followed_id == UserFollow.follower_id
+            )
+        )
+    )
     if cursor_created_at and cursor_id:
         query = query.where(
             or_(
                 UserFollow.created_at > cursor_created_at,
                 and_(
                     UserFollow.created_at == cursor_created_at,
-                    UserFollow.followed_id > cursor_id
+                    other_col > cursor_id
                 )
             )
         )
@@ -128,26 +287,31 @@ async def get_following_ids(
         query = query.where(
             UserFollow.created_at > cursor_created_at
         )
-    query = query.order_by(asc(UserFollow.created_at), UserFollow.followed_id)
-    result = await db.execute(query)
-    follows = result.scalars().all()
-    users = [f.followed for f in follows]
-
     if search:
-        users = [u for u in users if search.lower() in (u.nickname or "").lower()]
+        query = query.where(name_contains(User.nickname, search))
+    query = query.order_by(asc(UserFollow.created_at), other_col).limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.all()
 
-    users = users[:limit]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], None, None, False
+    users = [row.User for row in rows]
+    return users, rows[-1].created_at, users[-1].user_id, has_more
 
-    next_cursor_created_at = None
-    last_user_id = users[-1].id if users else None
-    if last_user_id:
-        for f in reversed(follows):
-            if f.followed_id == last_user_id:
-                next_cursor_created_at = f.created_at
-                break
 
-    next_cursor_id = users[-1].user_id if users else None
-    return users, next_cursor_created_at, next_cursor_id, len(users) == limit
+async def get_following_ids(
+        db: AsyncSession, 
+        id: uuid.UUID,
+        limit: int = 20,
+        cursor_created_at: Optional[datetime] = None, 
+        cursor_id: Optional[uuid.UUID] = None,
+        search: Optional[str] = None
+    ) -> tuple[list[User], Optional[datetime], Optional[str], bool]:
+    return await _get_follow_page(
+        db, UserFollow.follower_id, UserFollow.followed_id, id, limit, cursor_created_at, cursor_id, search
+    )
 
 
 async def get_follower_ids(
@@ -158,45 +322,9 @@ async def get_follower_ids(
         cursor_id: Optional[uuid.UUID] = None,
         search: Optional[str] = None
     ) -> tuple[list[User], Optional[datetime], Optional[str], bool]:
-    friend_ids = await get_friend_id_set(db, id)
-
-    query = select(UserFollow).options(selectinload(UserFollow.follower)).where(UserFollow.followed_id == id)
-    if friend_ids:
-        query = query.where(UserFollow.follower_id.notin_(friend_ids))
-    if cursor_created_at and cursor_id:
-        query = query.where(
-            or_(
-                UserFollow.created_at > cursor_created_at,
-                and_(
-                    UserFollow.created_at == cursor_created_at,
-                    UserFollow.follower_id > cursor_id
-                )
-            )
-        )
-    elif cursor_created_at and not cursor_id:
-        query = query.where(
-            UserFollow.created_at > cursor_created_at
-        )
-    query = query.order_by(asc(UserFollow.created_at), UserFollow.follower_id)
-    result = await db.execute(query)
-    follows = result.scalars().all()
-    users = [f.follower for f in follows]
-
-    if search:
-        users = [u for u in users if search.lower() in (u.nickname or "").lower()]
-
-    users = users[:limit]
-
-    next_cursor_created_at = None
-    last_user_id = users[-1].id if users else None
-    if last_user_id:
-        for f in reversed(follows):
-            if f.follower_id == last_user_id:
-                next_cursor_created_at = f.created_at
-                break
-
-    next_cursor_user_id = users[-1].user_id if users else None
-    return users, next_cursor_created_at, next_cursor_user_id, len(users) == limit
+    return await _get_follow_page(
+        db, UserFollow.followed_id, UserFollow.follower_id, id, limit, cursor_created_at, cursor_id, search
+    )
 
 async def get_friend_ids(
         db: AsyncSession, 
@@ -206,64 +334,45 @@ async def get_friend_ids(
         cursor_id: Optional[uuid.UUID] = None,
         search: Optional[str] = None
     ) -> tuple[list[User], Optional[datetime], Optional[str], bool]:
-    sub_a = select(
-        UserFollow.followed_id.label("friend_id"),
-        UserFollow.created_at.label("created_at_a")
-    ).where(UserFollow.follower_id == id).subquery()
-
-    sub_b = select(
-        UserFollow.follower_id.label("friend_id"),
-        UserFollow.created_at.label("created_at_b")
-    ).where(UserFollow.followed_id == id).subquery()
-
-    # 取交集并计算“成为朋友”的时间（max(a, b))
-    friend_since_col = func.greatest(sub_a.c.created_at_a, sub_b.c.created_at_b).label("friend_since")
-
-    join_stmt = select(
-        sub_a.c.friend_id,
-        friend_since_col
-    ).join(sub_b, sub_a.c.friend_id == sub_b.c.friend_id)
+    # fa: 我关注对方，fb: 对方关注我，两者同时存在即为朋友
+    fa = aliased(UserFollow)
+    fb = aliased(UserFollow)
+
+    # “成为朋友”的时间（max(a, b))
+    friend_since_col = func.greatest(fa.created_at, fb.created_at)
+
+    stmt = (
+        select(User, friend_since_col.label("friend_since"))
+        .select_from(fa)
+        .join(fb, and_(fb.follower_id == fa.followed_id, fb.followed_id == fa.follower_id))
+        .join(User, User.id == fa.followed_id)
+        .where(fa.follower_id == id)
+    )
 
     if cursor_created_at and cursor_id:
-        join_stmt = join_stmt.where(
+        stmt = stmt.where(
             or_(
                 friend_since_col > cursor_created_at,
                 and_(
                     friend_since_col == cursor_created_at,
-                    sub_a.c.friend_id > cursor_id  # 用 friend_id 作为 tie-breaker
+                    fa.followed_id > cursor_id  # 用 friend_id 作为 tie-breaker
                 )
             )
         )
     elif cursor_created_at and not cursor_id:
-        join_stmt = join_stmt.where(
+        stmt = stmt.where(
             friend_since_col > cursor_created_at
         )
+    if search:
+        stmt = stmt.where(name_contains(User.nickname, search))
 
-    join_stmt = join_stmt.order_by(friend_since_col, sub_a.c.friend_id)
-    result = await db.execute(join_stmt)
+    stmt = stmt.order_by(friend_since_col, fa.followed_id).limit(limit + 1)
+    result = await db.execute(stmt)
     rows = result.all()
 
-    friend_ids = [r.friend_id for r in rows]
-    friend_since_map = {r.friend_id: r.friend_since for r in rows}
-
-    if not friend_ids:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
         return [], None, None, False
-
-    # 加载用户信息
-    user_stmt = select(User).where(User.id.in_(friend_ids))
-    users_result = await db.execute(user_stmt)
-    users = users_result.scalars().all()
-
-    if search:
-        users = [u for u in users if search.lower() in (u.nickname or "").lower()]
-
-    if not users:
-        return [], None, None, False
-
-    # 保持顺序一致
-    users.sort(key=lambda u: friend_since_map.get(u.id))
-    users = users[:limit]
-
-    last_user = users[-1]
-    next_cursor_created_at = friend_since_map.get(last_user.id)
-    return users, next_cursor_created_at, last_user.user_id, len(users) == limit
\ No newline at end of file
+    users = [row.User for row in rows]
+    return users, rows[-1].friend_since, users[-1].user_id, has_more
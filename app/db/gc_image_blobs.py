@@ -0,0 +1,11 @@
+import asyncio
+from app.db.session import AsyncSessionLocal
+from app.services.image import gc_image_blobs
+
+# 定期清理 resources/blobs 下不再被引用的图片
+async def run_gc_image_blobs():
+    async with AsyncSessionLocal() as db:
+        await gc_image_blobs(db)
+
+if __name__ == "__main__":
+    asyncio.run(run_gc_image_blobs())
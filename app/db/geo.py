@@ -0,0 +1,68 @@
+import math
+from sqlalchemy import func, or_, and_
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9          # 入库精度，约 4.8m x 4.8m
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit, ch, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch |= 1 << (4 - bit)
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        if bit < 4:
+            bit += 1
+        else:
+            chars.append(GEOHASH_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars)
+
+
+def _cell_size_degrees(precision: int) -> tuple[float, float]:
+    # 返回 (纬度跨度, 经度跨度)，经度占奇数位时多一位
+    bits = precision * 5
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def geohash_search_cells(lat: float, lng: float, radius_km: float) -> list[str]:
+    # 取格子边长不小于半径的最长精度，查询点所在格子加周围 8 格即可覆盖整个圆
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+    precision = 1
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lng_deg = _cell_size_degrees(p)
+        if min(lat_deg * KM_PER_DEGREE, lng_deg * KM_PER_DEGREE * cos_lat) >= radius_km:
+            precision = p
+            break
+    lat_deg, lng_deg = _cell_size_degrees(precision)
+    cells = set()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            cell_lat = min(max(lat + dy * lat_deg, -90.0), 90.0 - 1e-9)
+            cell_lng = (lng + dx * lng_deg + 180.0) % 360.0 - 180.0
+            cells.add(geohash_encode(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+
+def geohash_prefix_filter(column, cells: list[str]):
+    # 列使用 C 排序规则，前缀匹配改写为区间比较：'{' 是 ASCII 中紧跟 'z' 的字符
+    return or_(*[and_(column >= cell, column < cell + "{") for cell in cells])
+
+
+def haversine_km(lat_col, lng_col, lat: float, lng: float):
+    # 球面距离（千米）的 SQL 表达式，只在 geohash 前缀筛出的候选行上计算
+    dlat = func.radians(lat_col - lat) * 0.5
+    dlng = func.radians(lng_col - lng) * 0.5
+    a = func.power(func.sin(dlat), 2) + \
+        math.cos(math.radians(lat)) * func.cos(func.radians(lat_col)) * func.power(func.sin(dlng), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
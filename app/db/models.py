@@ -1,10 +1,14 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, func, UniqueConstraint, Integer, Float
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, func, UniqueConstraint, Integer, Float, Index, Sequence
 from sqlalchemy.dialects.postgresql import UUID
 from app.schemas.user import UserRole
 from app.db.base import Base
+from app.db.search import trgm_index
 from sqlalchemy.orm import relationship
 
+# 用户 user_id 序号，注册时由序号映射出 user_id，无需查重
+user_id_seq = Sequence("user_id_seq", metadata=Base.metadata)
+
 # 用户表
 class User(Base):
     __tablename__ = "users"
@@ -31,6 +35,11 @@ class User(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # 昵称子串搜索（用户搜索、关注/粉丝/朋友列表搜索）
+        trgm_index("ix_users_nickname_trgm", "nickname"),
+    )
+
 # 用户关注关系表
 class UserFollow(Base):
     __tablename__ = "user_follows"
@@ -41,6 +50,9 @@ class UserFollow(Base):
 
     __table_args__ = (
         UniqueConstraint("follower_id", "followed_id", name="uq_follower_followed"),
+        # 关注/粉丝列表按 (created_at, 对方id) 做游标分页
+        Index("ix_user_follows_follower_created_followed", "follower_id", "created_at", "followed_id"),
+        Index("ix_user_follows_followed_created_follower", "followed_id", "created_at", "follower_id"),
     )
 
     # 与users表建立关联关系，可以方便的获取关注者和被关注者的User对象
@@ -48,6 +60,18 @@ class UserFollow(Base):
     followed = relationship("User", foreign_keys=[followed_id])
 
 
+# 用户关系计数表
+# 说明：关注/粉丝/朋友数量的冗余计数，由 create_follow/remove_follow 在同一事务中维护，
+# 读取时只需按主键查一行；计数漂移由 rebuild_relation_counts 修复
+class UserRelationCount(Base):
+    __tablename__ = "user_relation_counts"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")   # 关注数（不含朋友）
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")    # 粉丝数（不含朋友）
+    friend_count = Column(Integer, nullable=False, default=0, server_default="0")      # 朋友数（互相关注）
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 # 地区表
 # 说明：采用外键方式便于规范化区域管理，支持多赛事共享同一区域、支持未来添加区域元数据（如地图、天气等）
 class Region(Base):
@@ -56,6 +80,10 @@ class Region(Base):
     name = Column(String, nullable=False, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        trgm_index("ix_regions_name_trgm", "name"),
+    )
+
 
 # 赛季表
 class Season(Base):
@@ -69,6 +97,10 @@ class Season(Base):
     image_url = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        trgm_index("ix_seasons_name_trgm", "name"),
+    )
+
 
 # 赛事表
 class Event(Base):
@@ -88,6 +120,12 @@ class Event(Base):
     region = relationship("Region")
     season = relationship("Season")
 
+    __table_args__ = (
+        # 管理后台按 (created_at, event_id) 游标分页
+        Index("ix_events_created_at_event_id", "created_at", "event_id"),
+        trgm_index("ix_events_name_trgm", "name"),
+    )
+
 
 # 赛道表
 class Track(Base):
@@ -102,6 +140,7 @@ class Track(Base):
     from_lng = Column(Float, nullable=False)
     to_lat = Column(Float, nullable=False)
     to_lng = Column(Float, nullable=False)
+    from_geohash = Column(String(12, collation="C"), nullable=True)    # 起点 geohash，附近赛道查询按前缀区间走 B-tree 索引
 
     elevation_difference = Column(Integer, default=0)
     sub_region_name = Column(String, nullable=False)
@@ -113,6 +152,13 @@ class Track(Base):
 
     event = relationship("Event")
 
+    __table_args__ = (
+        # 管理后台按 (created_at, track_id) 游标分页
+        Index("ix_tracks_created_at_track_id", "created_at", "track_id"),
+        trgm_index("ix_tracks_name_trgm", "name"),
+        Index("ix_tracks_from_geohash", "from_geohash"),
+    )
+
 
 class RaceRecord(Base):
     __tablename__ = "race_records"
@@ -133,8 +179,54 @@ class RaceRecord(Base):
     is_team = Column(Boolean, default=False)
     team_code = Column(String, nullable=True)
 
+    __table_args__ = (
+        # 同一用户在同一赛道同一开始时间只有一条成绩，批量写入重试时据此去重
+        UniqueConstraint("user_id", "track_id", "start_time", name="uq_race_record_user_track_start"),
+        # 排行榜重建：按赛道取每个用户的最好成绩，索引覆盖 (track_id, user_id, duration_seconds)
+        Index("ix_race_records_track_user_duration", "track_id", "user_id", "duration_seconds"),
+    )
+
     # ORM 关系
     user = relationship("User")
     event = relationship("Event")
     track = relationship("Track")
-    season = relationship("Season")
\ No newline at end of file
+    season = relationship("Season")
+
+# 用户赛道最好得分表
+# 说明：积分榜的增量汇总依据，成绩写入时若刷新了某用户在某赛道的最好得分，只把差值累加到赛季/赛事积分榜
+class UserTrackBest(Base):
+    __tablename__ = "user_track_bests"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    track_id = Column(UUID(as_uuid=True), ForeignKey("tracks.id", ondelete="CASCADE"), primary_key=True)
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE"), nullable=False)
+    best_score = Column(Float, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# 赛季积分榜（各赛道最好得分之和）
+class SeasonStanding(Base):
+    __tablename__ = "season_standings"
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_score = Column(Float, nullable=False, default=0, server_default="0")
+    track_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_season_standings_season_score_user", "season_id", total_score.desc(), "user_id"),
+    )
+
+
+# 赛事积分榜（各赛道最好得分之和）
+class EventStanding(Base):
+    __tablename__ = "event_standings"
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_score = Column(Float, nullable=False, default=0, server_default="0")
+    track_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_event_standings_event_score_user", "event_id", total_score.desc(), "user_id"),
+    )
@@ -0,0 +1,11 @@
+import asyncio
+from app.db.session import AsyncSessionLocal
+from app.crud.standings import rebuild_standings
+
+# 从 race_records 全量重算赛道最好得分与赛季/赛事积分榜
+async def rebuild_all_standings():
+    async with AsyncSessionLocal() as db:
+        await rebuild_standings(db)
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_all_standings())
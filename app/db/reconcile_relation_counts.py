@@ -0,0 +1,11 @@
+import asyncio
+from app.db.session import AsyncSessionLocal
+from app.crud.user_follow import rebuild_relation_counts
+
+# 定期从 user_follows 重算 user_relation_counts，修复并发关注/取关造成的计数漂移
+async def reconcile_relation_counts():
+    async with AsyncSessionLocal() as db:
+        await rebuild_relation_counts(db)
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_relation_counts())
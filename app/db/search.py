@@ -0,0 +1,13 @@
+from sqlalchemy import Index, func, text
+
+# 子串搜索统一使用 lower(col) LIKE '%kw%'，由 pg_trgm 的 GIN 表达式索引 lower(col) gin_trgm_ops 支撑，
+# 新增可搜索字段时需同时用 trgm_index 建立索引
+
+
+def trgm_index(name: str, column: str) -> Index:
+    return Index(name, text(f"lower({column}) gin_trgm_ops"), postgresql_using="gin")
+
+
+def name_contains(column, keyword: str):
+    # 大小写不敏感的子串匹配，转义关键字中的 % 和 _
+    return func.lower(column).contains(keyword.lower(), autoescape=True)
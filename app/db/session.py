@@ -1,10 +1,129 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import exc
 from app.core.config import settings
+from app.db.redis import redis_client
+from uuid import uuid4
+import time
 
-engine = create_async_engine(settings.DATABASE_URL, future=True, echo=False)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # 统计获取连接的排队数与等待时长（按 worker 进程、按连接池），连接饥饿时可直接从指标看出
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = {
+            "waiting": 0,               # 正在等待连接的请求数
+            "checkouts": 0,             # 累计获取连接次数
+            "slow_checkouts": 0,        # 等待超过 DB_POOL_SLOW_CHECKOUT_MS 的次数
+            "timeouts": 0,              # 等待超过 DB_POOL_TIMEOUT 失败的次数
+            "checkout_wait_ms_total": 0.0,
+            "checkout_wait_ms_max": 0.0
+        }
+
+    def connect(self):
+        metrics = self.metrics
+        metrics["waiting"] += 1
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            metrics["timeouts"] += 1
+            raise
+        finally:
+            metrics["waiting"] -= 1
+        wait_ms = (time.perf_counter() - start) * 1000
+        metrics["checkouts"] += 1
+        metrics["checkout_wait_ms_total"] += wait_ms
+        metrics["checkout_wait_ms_max"] = max(metrics["checkout_wait_ms_max"], wait_ms)
+        if wait_ms > settings.DB_POOL_SLOW_CHECKOUT_MS:
+            metrics["slow_checkouts"] += 1
+        return conn
+
+
+def _connect_args() -> dict:
+    if not settings.DB_PGBOUNCER:
+        return {}
+    # PgBouncer transaction 模式下同一会话可能落到不同后端连接，预编译语句不能缓存且名称必须唯一
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+    }
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        future=True,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args()
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+# 未配置从库时只读会话直接复用主库引擎
+read_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+AsyncReadSessionLocal = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+        **pool.metrics
+    }
+
+
+def get_pool_status() -> dict:
+    status = {"primary": _pool_status(engine.pool)}
+    if read_engine is not engine:
+        status["replica"] = _pool_status(read_engine.pool)
+    return status
+
+
+def is_primary_session(db: AsyncSession) -> bool:
+    # 从库数据存在复制延迟，长期有效的 Redis 状态（缓存、排行榜）只能基于主库会话填充
+    return read_engine is engine or db.bind is engine
+
+
+def _recent_write_key(user_id: str):
+    return f"recent_write:{user_id}"
+
+
+async def mark_recent_write(*user_ids: str):
+    # 标记用户刚写入过数据，READ_YOUR_WRITES_SECONDS 内其只读请求改走主库
+    if read_engine is engine or not user_ids:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.set(_recent_write_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    await pipe.execute()
+
+
+async def has_recent_write(user_ids: list[str]) -> bool:
+    if not user_ids:
+        return False
+    return await redis_client.exists(*[_recent_write_key(user_id) for user_id in user_ids]) > 0
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_session(user_ids: list[str]):
+    session_factory = AsyncSessionLocal
+    if read_engine is not engine and not await has_recent_write(user_ids):
+        session_factory = AsyncReadSessionLocal
+    async with session_factory() as session:
+        yield session
@@ -1,4 +1,5 @@
 from fastapi import Form
+from pydantic import Field
 from app.schemas.base import ORMBase
 from datetime import datetime
 from enum import Enum
@@ -99,6 +100,10 @@ class EventBaseInfo(ORMBase):
 
 class EventListResponse(ORMBase):
     events: List[EventBaseInfo]
+    next_cursor_created_at: Optional[str] = None
+    next_cursor_id: Optional[str] = None
+    has_more: bool = False
+    total: Optional[int] = None   # 估算值，仅在 with_total=true 时返回
 
 class TrackCreateForm:
     name: str
@@ -217,3 +222,58 @@ class TrackBaseInfo(ORMBase):
 
 class TrackListResponse(ORMBase):
     tracks: List[TrackBaseInfo]
+    next_cursor_created_at: Optional[str] = None
+    next_cursor_id: Optional[str] = None
+    has_more: bool = False
+    total: Optional[int] = None   # 估算值，仅在 with_total=true 时返回
+
+class NearbyTrackInfo(TrackBaseInfo):
+    distance_km: float
+
+class NearbyTrackListResponse(ORMBase):
+    tracks: List[NearbyTrackInfo]
+
+class SeasonImportItem(ORMBase):
+    name: str
+    start_date: datetime
+    end_date: datetime
+    sport_type: SportType
+
+class EventImportItem(ORMBase):
+    name: str
+    description: Optional[str] = None
+    start_date: datetime
+    end_date: datetime
+    season_name: str
+    region_name: str
+    sport_type: SportType
+
+class TrackImportItem(ORMBase):
+    name: str
+    start_date: datetime
+    end_date: datetime
+    event_name: str
+    from_latitude: float
+    from_longitude: float
+    to_latitude: float
+    to_longitude: float
+    elevation_difference: int = 0
+    sub_region_name: str
+    fee: int = 0
+    prize_pool: int = 0
+
+class CatalogImportRequest(ORMBase):
+    seasons: List[SeasonImportItem] = Field(default_factory=list, max_length=2000)
+    events: List[EventImportItem] = Field(default_factory=list, max_length=2000)
+    tracks: List[TrackImportItem] = Field(default_factory=list, max_length=2000)
+
+class CatalogImportError(ORMBase):
+    kind: str       # "season" / "event" / "track"
+    index: int
+    message: str
+
+class CatalogImportResponse(ORMBase):
+    seasons: int
+    events: int
+    tracks: int
+    errors: List[CatalogImportError]
@@ -0,0 +1,34 @@
+from typing import Optional, List
+from app.schemas.base import ORMBase
+
+
+class LeaderboardEntry(ORMBase):
+    rank: int
+    user_id: str
+    nickname: str
+    avatar_image_url: str
+    duration_seconds: float
+
+class LeaderboardResponse(ORMBase):
+    track_id: str
+    total: int
+    entries: List[LeaderboardEntry]
+
+class LeaderboardMyRankResponse(ORMBase):
+    track_id: str
+    total: int
+    rank: Optional[int]
+    duration_seconds: Optional[float]
+
+class StandingEntry(ORMBase):
+    user_id: str
+    nickname: str
+    avatar_image_url: str
+    total_score: float
+    track_count: int
+
+class StandingsResponse(ORMBase):
+    entries: List[StandingEntry]
+    next_cursor_score: Optional[float]
+    next_cursor_id: Optional[str]
+    has_more: bool
@@ -0,0 +1,27 @@
+from pydantic import Field
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.base import ORMBase
+
+
+class RaceRecordCreate(ORMBase):
+    user_id: str
+    track_id: str
+    start_time: datetime
+    end_time: datetime
+    duration_seconds: float
+    score: Optional[float] = None
+    is_team: bool = False
+    team_code: Optional[str] = None
+
+class RaceRecordBatchRequest(ORMBase):
+    records: List[RaceRecordCreate] = Field(..., max_length=1000)
+
+class RaceRecordError(ORMBase):
+    index: int
+    message: str
+
+class RaceRecordBatchResponse(ORMBase):
+    inserted: int
+    duplicated: int
+    errors: List[RaceRecordError]
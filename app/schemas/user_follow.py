@@ -1,5 +1,7 @@
 from typing import Optional, List
+from pydantic import Field
 from app.schemas.base import ORMBase
+from app.schemas.user import RelationshipStatus
 from enum import Enum
 
 
@@ -13,3 +15,18 @@ class RelationListResponse(ORMBase):
     next_cursor_created_at: Optional[str]
     next_cursor_id: Optional[str]
     has_more: bool
+
+class UserSearchResponse(ORMBase):
+    users: List[PersonInfoResponse]
+    next_cursor_id: Optional[str]
+    has_more: bool
+
+class RelationshipBatchRequest(ORMBase):
+    user_ids: List[str] = Field(..., max_length=100)
+
+class RelationshipItem(ORMBase):
+    user_id: str
+    relationship: RelationshipStatus
+
+class RelationshipBatchResponse(ORMBase):
+    relationships: List[RelationshipItem]
@@ -0,0 +1,66 @@
+from app.db.redis import redis_client
+from collections import OrderedDict
+from typing import Awaitable, Callable, Type, TypeVar
+from pydantic import BaseModel
+from uuid import uuid4
+import hashlib
+import json
+import time
+
+# 赛季/赛事/赛道/区域目录的读缓存
+# 说明：Redis 中只保存一个全局版本号，缓存 key 带版本号；任何目录写入都把版本号换成新的随机值，
+# 所有 worker 下一次读取时看到新版本即自然失效，无需逐 key 删除。版本号用随机值而不是自增计数，
+# Redis 丢失版本号 key 后重新生成的版本也不会与各 worker 进程内缓存的旧 key 重合
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_CACHE_TTL_SECONDS = 3600
+CATALOG_LOCAL_CACHE_SIZE = 1024
+CATALOG_LOCAL_CACHE_TTL_SECONDS = 5  # 进程内缓存兜底过期，单次失效遗漏最多影响几秒
+
+T = TypeVar("T", bound=BaseModel)
+
+# 进程内 LRU：key -> (反序列化后的响应模型, 过期时间)
+_local_cache: "OrderedDict[str, tuple[BaseModel, float]]" = OrderedDict()
+
+
+async def get_catalog_version() -> str:
+    version = await redis_client.get(CATALOG_VERSION_KEY)
+    if version:
+        return version
+    # 版本号不存在（首次使用或 Redis 数据丢失）时初始化，并发初始化以先写入者为准
+    version = uuid4().hex
+    if await redis_client.set(CATALOG_VERSION_KEY, version, nx=True):
+        return version
+    return await redis_client.get(CATALOG_VERSION_KEY) or version
+
+
+async def bump_catalog_version():
+    await redis_client.set(CATALOG_VERSION_KEY, uuid4().hex)
+    _local_cache.clear()
+
+
+def _catalog_cache_key(version: str, name: str, params: dict) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"catalog:{version}:{name}:{digest}"
+
+
+async def get_or_load_catalog(name: str, params: dict, model: Type[T], loader: Callable[[], Awaitable[T]]) -> T:
+    # 依次查进程内缓存、Redis 共享缓存，都未命中才访问数据库
+    key = _catalog_cache_key(await get_catalog_version(), name, params)
+    now = time.monotonic()
+    cached = _local_cache.get(key)
+    if cached is not None and cached[1] > now:
+        _local_cache.move_to_end(key)
+        return cached[0]
+
+    raw = await redis_client.get(key)
+    if raw is not None:
+        value = model.model_validate_json(raw)
+    else:
+        value = await loader()
+        await redis_client.set(key, value.model_dump_json(), ex=CATALOG_CACHE_TTL_SECONDS)
+
+    _local_cache[key] = (value, now + CATALOG_LOCAL_CACHE_TTL_SECONDS)
+    _local_cache.move_to_end(key)
+    if len(_local_cache) > CATALOG_LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+    return value
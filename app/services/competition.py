@@ -9,6 +9,10 @@ from app.crud.competition import (
     create_event_crud, create_track_crud,
     update_event_crud, update_track_crud,
     query_events_crud, query_tracks_crud,
+    query_nearby_tracks_crud,
+    get_seasons_by_name_and_sport_type,
+    get_region_ids_by_names, get_event_ids_by_names,
+    get_existing_track_names, bulk_create_catalog_crud, lock_catalog_import,
     create_region_crud
 )
 from app.core.errors import ErrorCode
@@ -19,12 +23,33 @@ from app.schemas.competition import (
     EventBaseInfo, EventUpdateForm,
     RegionCreate, SeasonBaseInfo,
     TrackBaseInfo, TrackCreateForm,
-    TrackUpdateForm
+    TrackUpdateForm, EventListResponse,
+    TrackListResponse, NearbyTrackInfo,
+    NearbyTrackListResponse, CatalogImportRequest,
+    CatalogImportResponse, CatalogImportError,
+    SeasonImportItem, EventImportItem, TrackImportItem
 )
 from app.db.models import Season, Event, Region, Track
+from app.db.geo import geohash_encode
+from app.services.catalog_cache import get_or_load_catalog, bump_catalog_version
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
+from datetime import datetime
+import csv
+import io
 import uuid
 
+SEASON_PLACEHOLDER_IMAGE = "/resources/placeholder/season.png"
+EVENT_PLACEHOLDER_IMAGE = "/resources/placeholder/event.png"
+TRACK_PLACEHOLDER_IMAGE = "/resources/placeholder/track.png"
+CATALOG_IMPORT_MAX_BYTES = 5 * 1024 * 1024
+CATALOG_IMPORT_KINDS = {
+    "season": ("seasons", SeasonImportItem),
+    "event": ("events", EventImportItem),
+    "track": ("tracks", TrackImportItem)
+}
+
 
 async def create_season_service(db: AsyncSession, season_create: SeasonCreateForm, image_url: str) -> SeasonBaseInfo:
     season = await get_season_by_name_and_sport_type(db, season_create.name, season_create.sport_type.value)
@@ -40,6 +65,7 @@ async def create_season_service(db: AsyncSession, season_create: SeasonCreateFor
         image_url=image_url
     )
     res = await create_season_crud(db, new_season)
+    await bump_catalog_version()
     return SeasonBaseInfo(
         season_id=res.season_id,
         name=res.name,
@@ -58,6 +84,7 @@ async def update_season_image_url(db: AsyncSession, season_id: str, image_url: s
         "image_url": image_url
     }
     await update_season_crud(db, existing_season, update_data)
+    await bump_catalog_version()
 
 
 async def create_region_service(db: AsyncSession, region_create: RegionCreate):
@@ -68,6 +95,7 @@ async def create_region_service(db: AsyncSession, region_create: RegionCreate):
         name=region_create.name
     )
     await create_region_crud(db, new_region)
+    await bump_catalog_version()
 
 
 async def create_event_service(db: AsyncSession, event_form: EventCreateForm, image_url: str) -> EventBaseInfo:
@@ -95,6 +123,7 @@ async def create_event_service(db: AsyncSession, event_form: EventCreateForm, im
         image_url=image_url
     )
     res = await create_event_crud(db, new_event)
+    await bump_catalog_version()
     return EventBaseInfo(
         event_id=res.event_id,
         name=res.name,
@@ -120,6 +149,7 @@ async def update_event_service(db: AsyncSession, event: EventUpdateForm, image_u
         "image_url": image_url
     }
     await update_event_crud(db, existing_event, update_data)
+    await bump_catalog_version()
 
 
 async def update_event_image_url(db: AsyncSession, event_id: str, image_url: str):
@@ -130,6 +160,7 @@ async def update_event_image_url(db: AsyncSession, event_id: str, image_url: str
         "image_url": image_url
     }
     await update_event_crud(db, existing_event, update_data)
+    await bump_catalog_version()
 
 
 async def query_events_service(
@@ -138,29 +169,45 @@ async def query_events_service(
     region_name: Optional[str],
     sport_type: Optional[str],
     event_name: Optional[str],
-    page: int,
-    size: int
-) -> List[EventBaseInfo]:
-    events = await query_events_crud(
-        db=db,
+    size: int,
+    page: Optional[int] = None,
+    cursor_created_at: Optional[datetime] = None,
+    cursor_id: Optional[str] = None,
+    with_total: bool = False
+) -> EventListResponse:
+    params = dict(
         season_name=season_name,
         region_name=region_name,
         sport_type=sport_type,
         event_name=event_name,
+        size=size,
         page=page,
-        size=size
+        cursor_created_at=cursor_created_at,
+        cursor_id=cursor_id,
+        with_total=with_total
+    )
+    return await get_or_load_catalog("events", params, EventListResponse, lambda: _load_events(db, params))
+
+
+async def _load_events(db: AsyncSession, params: dict) -> EventListResponse:
+    events, has_more, total = await query_events_crud(db=db, **params)
+    return EventListResponse(
+        events=[EventBaseInfo(
+            event_id=e.event_id,
+            name=e.name,
+            description=e.description,
+            start_date=e.start_date.isoformat(),
+            end_date=e.end_date.isoformat(),
+            season_name=e.season.name,
+            region_name=e.region.name,
+            sport_type=e.season.sport_type,
+            image_url=e.image_url
+        ) for e in events],
+        next_cursor_created_at=events[-1].created_at.isoformat() if events else None,
+        next_cursor_id=events[-1].event_id if events else None,
+        has_more=has_more,
+        total=total
     )
-    return [EventBaseInfo(
-        event_id=e.event_id,
-        name=e.name,
-        description=e.description,
-        start_date=e.start_date.isoformat(),
-        end_date=e.end_date.isoformat(),
-        season_name=e.season.name,
-        region_name=e.region.name,
-        sport_type=e.season.sport_type,
-        image_url=e.image_url
-    ) for e in events]
 
 
 async def create_track_service(db: AsyncSession, track_form: TrackCreateForm, image_url: str) -> TrackBaseInfo:
@@ -191,6 +238,7 @@ async def create_track_service(db: AsyncSession, track_form: TrackCreateForm, im
         from_lng = track_form.from_longitude,
         to_lat = track_form.to_latitude,
         to_lng = track_form.to_longitude,
+        from_geohash = geohash_encode(track_form.from_latitude, track_form.from_longitude),
         elevation_difference = track_form.elevationDifference,
         sub_region_name = track_form.subRegioName,
         fee = track_form.fee,
@@ -198,6 +246,7 @@ async def create_track_service(db: AsyncSession, track_form: TrackCreateForm, im
         image_url = image_url
     )
     res = await create_track_crud(db, new_track)
+    await bump_catalog_version()
     return TrackBaseInfo(
         track_id=res.track_id,
         name=res.name,
@@ -231,6 +280,7 @@ async def update_track_service(db: AsyncSession, track: TrackUpdateForm, image_u
         "from_lng": track.from_longitude,
         "to_lat": track.to_latitude,
         "to_lng": track.to_longitude,
+        "from_geohash": geohash_encode(track.from_latitude, track.from_longitude),
         "elevationDifference": track.elevationDifference,
         "subRegioName": track.subRegioName,
         "fee": track.fee,
@@ -238,6 +288,7 @@ async def update_track_service(db: AsyncSession, track: TrackUpdateForm, image_u
         "image_url": image_url
     }
     await update_track_crud(db, existing_track, update_data)
+    await bump_catalog_version()
 
 
 async def update_track_image_url(db: AsyncSession, track_id: str, image_url: str):
@@ -248,29 +299,11 @@ async def update_track_image_url(db: AsyncSession, track_id: str, image_url: str
         "image_url": image_url
     }
     await update_track_crud(db, existing_track, update_data)
+    await bump_catalog_version()
 
 
-async def query_tracks_service(
-    db: AsyncSession,
-    track_name: Optional[str],
-    event_name: Optional[str],
-    season_name: Optional[str],
-    region_name: Optional[str],
-    sport_type: Optional[str],
-    page: int,
-    size: int
-) -> List[TrackBaseInfo]:
-    tracks = await query_tracks_crud(
-        db=db,
-        track_name=track_name,
-        event_name=event_name,
-        season_name=season_name,
-        region_name=region_name,
-        sport_type=sport_type,
-        page=page,
-        size=size
-    )
-    return [TrackBaseInfo(
+def _track_info_fields(t: Track) -> dict:
+    return dict(
         track_id=t.track_id,
         name=t.name,
         start_date=t.start_date.isoformat(),
@@ -288,4 +321,199 @@ async def query_tracks_service(
         sub_region_name=t.sub_region_name,
         fee=str(t.fee),
         prize_pool=str(t.prize_pool)
-    ) for t in tracks]
\ No newline at end of file
+    )
+
+
+async def query_tracks_service(
+    db: AsyncSession,
+    track_name: Optional[str],
+    event_name: Optional[str],
+    season_name: Optional[str],
+    region_name: Optional[str],
+    sport_type: Optional[str],
+    size: int,
+    page: Optional[int] = None,
+    cursor_created_at: Optional[datetime] = None,
+    cursor_id: Optional[str] = None,
+    with_total: bool = False
+) -> TrackListResponse:
+    params = dict(
+        track_name=track_name,
+        event_name=event_name,
+        season_name=season_name,
+        region_name=region_name,
+        sport_type=sport_type,
+        size=size,
+        page=page,
+        cursor_created_at=cursor_created_at,
+        cursor_id=cursor_id,
+        with_total=with_total
+    )
+    return await get_or_load_catalog("tracks", params, TrackListResponse, lambda: _load_tracks(db, params))
+
+
+async def _load_tracks(db: AsyncSession, params: dict) -> TrackListResponse:
+    tracks, has_more, total = await query_tracks_crud(db=db, **params)
+    return TrackListResponse(
+        tracks=[TrackBaseInfo(**_track_info_fields(t)) for t in tracks],
+        next_cursor_created_at=tracks[-1].created_at.isoformat() if tracks else None,
+        next_cursor_id=tracks[-1].track_id if tracks else None,
+        has_more=has_more,
+        total=total
+    )
+
+
+async def query_nearby_tracks_service(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    sport_type: Optional[str],
+    limit: int
+) -> NearbyTrackListResponse:
+    rows = await query_nearby_tracks_crud(db, latitude, longitude, radius_km, sport_type, limit)
+    return NearbyTrackListResponse(
+        tracks=[NearbyTrackInfo(**_track_info_fields(t), distance_km=round(distance, 3)) for t, distance in rows]
+    )
+
+
+async def import_catalog_service(db: AsyncSession, data: CatalogImportRequest) -> CatalogImportResponse:
+    # 所有引用的名称用集合查询一次性解析，本批新建的赛季/赛事可被后续行引用，出错的行跳过并记录
+    errors: list[CatalogImportError] = []
+
+    await lock_catalog_import(db)
+    season_ids = await get_seasons_by_name_and_sport_type(db, list(
+        {(s.name, s.sport_type.value) for s in data.seasons} |
+        {(e.season_name, e.sport_type.value) for e in data.events}
+    ))
+    region_ids = await get_region_ids_by_names(db, list({e.region_name for e in data.events}))
+    event_ids = await get_event_ids_by_names(db, list(
+        {e.name for e in data.events} | {t.event_name for t in data.tracks}
+    ))
+    track_names = await get_existing_track_names(db, list({t.name for t in data.tracks}))
+
+    new_seasons = []
+    for index, season in enumerate(data.seasons):
+        key = (season.name, season.sport_type.value)
+        if key in season_ids:
+            errors.append(CatalogImportError(kind="season", index=index, message="赛季已存在"))
+            continue
+        if season.end_date < season.start_date:
+            errors.append(CatalogImportError(kind="season", index=index, message="结束时间早于开始时间"))
+            continue
+        season_ids[key] = uuid.uuid4()
+        new_seasons.append({
+            "id": season_ids[key],
+            "season_id": f"season_{str(uuid.uuid4())[:8]}",
+            "name": season.name,
+            "start_date": season.start_date,
+            "end_date": season.end_date,
+            "sport_type": season.sport_type.value,
+            "image_url": SEASON_PLACEHOLDER_IMAGE
+        })
+
+    new_events = []
+    for index, event in enumerate(data.events):
+        season_db_id = season_ids.get((event.season_name, event.sport_type.value))
+        region_db_id = region_ids.get(event.region_name)
+        if event.name in event_ids:
+            errors.append(CatalogImportError(kind="event", index=index, message="赛事已存在"))
+            continue
+        if season_db_id is None:
+            errors.append(CatalogImportError(kind="event", index=index, message="赛季不存在"))
+            continue
+        if region_db_id is None:
+            errors.append(CatalogImportError(kind="event", index=index, message="地理区域不存在"))
+            continue
+        if event.end_date < event.start_date:
+            errors.append(CatalogImportError(kind="event", index=index, message="结束时间早于开始时间"))
+            continue
+        event_ids[event.name] = uuid.uuid4()
+        new_events.append({
+            "id": event_ids[event.name],
+            "event_id": f"event_{str(uuid.uuid4())[:8]}",
+            "name": event.name,
+            "description": event.description,
+            "start_date": event.start_date,
+            "end_date": event.end_date,
+            "region_id": region_db_id,
+            "season_id": season_db_id,
+            "image_url": EVENT_PLACEHOLDER_IMAGE
+        })
+
+    new_tracks = []
+    for index, track in enumerate(data.tracks):
+        event_db_id = event_ids.get(track.event_name)
+        if track.name in track_names:
+            errors.append(CatalogImportError(kind="track", index=index, message="赛道已存在"))
+            continue
+        if event_db_id is None:
+            errors.append(CatalogImportError(kind="track", index=index, message="赛事不存在"))
+            continue
+        if track.end_date < track.start_date:
+            errors.append(CatalogImportError(kind="track", index=index, message="结束时间早于开始时间"))
+            continue
+        track_names.add(track.name)
+        new_tracks.append({
+            "id": uuid.uuid4(),
+            "track_id": f"track_{str(uuid.uuid4())[:8]}",
+            "name": track.name,
+            "start_date": track.start_date,
+            "end_date": track.end_date,
+            "event_id": event_db_id,
+            "from_lat": track.from_latitude,
+            "from_lng": track.from_longitude,
+            "to_lat": track.to_latitude,
+            "to_lng": track.to_longitude,
+            "from_geohash": geohash_encode(track.from_latitude, track.from_longitude),
+            "elevation_difference": track.elevation_difference,
+            "sub_region_name": track.sub_region_name,
+            "fee": track.fee,
+            "prize_pool": track.prize_pool,
+            "image_url": TRACK_PLACEHOLDER_IMAGE
+        })
+
+    try:
+        await bulk_create_catalog_crud(db, new_seasons, new_events, new_tracks)
+    except IntegrityError:
+        # 与并发的单条创建等写入冲突，整批回滚，由调用方重试
+        raise BizException(code=ErrorCode.CATALOG_IMPORT_CONFLICT, message="导入数据与已有数据冲突，请重试")
+    await bump_catalog_version()
+    return CatalogImportResponse(
+        seasons=len(new_seasons),
+        events=len(new_events),
+        tracks=len(new_tracks),
+        errors=errors
+    )
+
+
+async def import_catalog_csv_service(db: AsyncSession, kind: str, content: bytes) -> CatalogImportResponse:
+    # CSV 表头与对应的导入项字段同名，逐行校验后复用 import_catalog_service，错误行号映射回 CSV 数据行
+    if len(content) > CATALOG_IMPORT_MAX_BYTES:
+        raise BizException(code=ErrorCode.IMPORT_FILE_INVALID, message="导入文件过大")
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BizException(code=ErrorCode.IMPORT_FILE_INVALID, message="导入文件需为 UTF-8 编码的 CSV")
+    field, item_cls = CATALOG_IMPORT_KINDS[kind]
+
+    items = []
+    row_indexes = []
+    errors: list[CatalogImportError] = []
+    for index, row in enumerate(csv.DictReader(io.StringIO(text))):
+        try:
+            items.append(item_cls.model_validate({k: v for k, v in row.items() if k and v not in ("", None)}))
+            row_indexes.append(index)
+        except ValidationError as e:
+            detail = e.errors()[0]
+            errors.append(CatalogImportError(kind=kind, index=index, message=f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}"))
+
+    try:
+        request = CatalogImportRequest(**{field: items})
+    except ValidationError:
+        raise BizException(code=ErrorCode.IMPORT_FILE_INVALID, message="导入行数超出限制")
+    result = await import_catalog_service(db, request)
+    for error in result.errors:
+        error.index = row_indexes[error.index]
+    result.errors = sorted(errors + result.errors, key=lambda e: e.index)
+    return result
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.errors import ErrorCode
+from app.db.models import User, Season, Event, Track
+from app.schemas.base import BizException
+from app.services.upload import save_upload_file
+
+# 各尺寸变体的最长边，按顺序生成，full 最后落盘，full 存在即代表所有变体都已就绪
+IMAGE_VARIANTS = {"thumb": 128, "medium": 640, "full": 2048}
+IMAGE_FORMAT_SUFFIX = ".webp"
+IMAGE_PROCESS_WORKERS = 2
+# 上传图片的像素上限：1MB 的 PNG 可解码出数千万像素，超过上限的图片在解码前拒绝，避免子进程内存暴涨被杀
+IMAGE_MAX_PIXELS = 4096 * 4096
+Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+
+# 内容寻址存储：图片按原始内容的 sha256 命名，相同内容只存一份，URL 永不变化
+IMAGE_BLOB_DIR = Path("resources/blobs")
+IMAGE_BLOB_URL_PREFIX = "/resources/blobs/"
+IMAGE_BLOB_GC_GRACE_SECONDS = 24 * 3600  # 新写入的图片在入库前可能暂未被引用，留出宽限期
+IMAGE_FILE_MODE = 0o644
+
+# 内容寻址之前按对象目录存放的历史图片：resources/<kind>/<对象id>/<文件名>，同样由 GC 回收
+IMAGE_LEGACY_ROOT = Path("resources")
+IMAGE_LEGACY_KINDS = ("user", "season", "event", "track")
+
+_image_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_image_pool() -> ProcessPoolExecutor:
+    # 首次转码时再创建进程池，避免在导入时 fork
+    global _image_pool
+    if _image_pool is None:
+        _image_pool = ProcessPoolExecutor(max_workers=IMAGE_PROCESS_WORKERS)
+    return _image_pool
+
+
+def _discard_image_pool(pool: ProcessPoolExecutor):
+    # 子进程异常退出（如 OOM 被杀）后进程池不可再用，丢弃后下次转码重新创建
+    global _image_pool
+    if _image_pool is pool:
+        _image_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _variant_name(stem: str, variant: str) -> str:
+    if variant == "full":
+        return f"{stem}{IMAGE_FORMAT_SUFFIX}"
+    return f"{stem}_{variant}{IMAGE_FORMAT_SUFFIX}"
+
+
+def image_variant_url(url: str, variant: str) -> str:
+    # 只有经过转码的图片（.webp）才有尺寸变体，占位图和历史图片返回原图
+    if variant == "full" or not url.endswith(IMAGE_FORMAT_SUFFIX):
+        return url
+    return f"{url[:-len(IMAGE_FORMAT_SUFFIX)]}_{variant}{IMAGE_FORMAT_SUFFIX}"
+
+
+def _fit(img: Image.Image, max_side: int) -> Image.Image:
+    if max(img.size) <= max_side:
+        return img
+    ratio = max_side / max(img.size)
+    size = (max(1, round(img.width * ratio)), max(1, round(img.height * ratio)))
+    return img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+
+def transcode_image(src: str, folder: str, stem: str):
+    # 在子进程中执行：解码原图并生成各尺寸 WebP 变体
+    with Image.open(src) as img:
+        # Image.open 只读取文件头，在解码前按尺寸拒绝超大图片
+        if img.width * img.height > IMAGE_MAX_PIXELS:
+            raise Image.DecompressionBombError(f"image has {img.width * img.height} pixels")
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        # 从大到小逐级缩放，只有第一级基于原图，不为每个变体复制一份原图
+        resized = {}
+        current = img
+        for variant, max_side in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+            current = resized[variant] = _fit(current, max_side)
+        for variant in IMAGE_VARIANTS:
+            dest = Path(folder) / _variant_name(stem, variant)
+            # 相同内容可能被并发上传，临时文件名必须唯一；os.replace 覆盖同内容的目标文件无副作用
+            fd, tmp = tempfile.mkstemp(dir=folder, prefix=f".{dest.name}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                resized[variant].save(tmp, "WEBP", quality=80, method=4)
+                os.chmod(tmp, IMAGE_FILE_MODE)
+                os.replace(tmp, dest)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+
+def _touch_if_exists(path: Path) -> bool:
+    # 复用已有图片时刷新修改时间，防止其在入库前被 GC 回收
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+async def _run_transcode(src: str, folder: str, stem: str):
+    # 进程池损坏时换一个新进程池重试一次；仍失败（多半是这张图片本身导致子进程崩溃）则交给调用方按无效图片处理
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = _get_image_pool()
+        try:
+            return await loop.run_in_executor(pool, transcode_image, src, folder, stem)
+        except BrokenProcessPool:
+            _discard_image_pool(pool)
+            if attempt:
+                raise
+
+
+async def save_image(file: UploadFile, max_bytes: Optional[int] = None) -> str:
+    # 返回 full 变体的 URL，thumb/medium 通过 image_variant_url 推导
+    hasher = hashlib.sha256()
+    src = await save_upload_file(file, IMAGE_BLOB_DIR, max_bytes=max_bytes, hasher=hasher)
+    digest = hasher.hexdigest()
+    folder = IMAGE_BLOB_DIR / digest[:2]
+    full = folder / _variant_name(digest, "full")
+    try:
+        if not await run_in_threadpool(_touch_if_exists, full):
+            await run_in_threadpool(folder.mkdir, parents=True, exist_ok=True)
+            await _run_transcode(str(src), str(folder), digest)
+    except Image.DecompressionBombError:
+        raise BizException(code=ErrorCode.IMAGE_UPLOAD_OVERSIZE, message="上传图片分辨率超过限制")
+    except (OSError, BrokenProcessPool):
+        # 并发上传的相同图片已由另一请求生成完毕时视为成功
+        if not await run_in_threadpool(_touch_if_exists, full):
+            raise BizException(code=ErrorCode.IMAGE_INVALID, message="无法识别的图片格式")
+    finally:
+        await run_in_threadpool(src.unlink, missing_ok=True)
+    return f"{IMAGE_BLOB_URL_PREFIX}{digest[:2]}/{_variant_name(digest, 'full')}"
+
+
+def _remove_unreferenced_blobs(referenced: set[str]) -> int:
+    removed = 0
+    deadline = time.time() - IMAGE_BLOB_GC_GRACE_SECONDS
+    for full in IMAGE_BLOB_DIR.glob(f"*/*{IMAGE_FORMAT_SUFFIX}"):
+        digest = full.name[:-len(IMAGE_FORMAT_SUFFIX)]
+        if "_" in digest or digest in referenced:
+            continue
+        try:
+            if full.stat().st_mtime > deadline:
+                continue
+        except FileNotFoundError:
+            continue
+        # 先删小变体，最后删 full，保证 full 存在时变体齐全
+        for variant in reversed(IMAGE_VARIANTS):
+            (full.parent / _variant_name(digest, variant)).unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def _remove_unreferenced_legacy_images(referenced: set[str]) -> int:
+    removed = 0
+    deadline = time.time() - IMAGE_BLOB_GC_GRACE_SECONDS
+    for kind in IMAGE_LEGACY_KINDS:
+        for folder in (IMAGE_LEGACY_ROOT / kind).glob("*"):
+            if not folder.is_dir():
+                continue
+            for file in folder.iterdir():
+                if f"/{file.as_posix()}" in referenced:
+                    continue
+                try:
+                    if file.stat().st_mtime > deadline:
+                        continue
+                except FileNotFoundError:
+                    continue
+                file.unlink(missing_ok=True)
+                removed += 1
+            try:
+                folder.rmdir()
+            except OSError:
+                pass
+    return removed
+
+
+async def gc_image_blobs(db: AsyncSession) -> int:
+    # 回收不再被任何用户、赛季、赛事、赛道引用的图片，包括内容寻址存储之前的历史图片
+    stmt = union(
+        select(User.avatar_image_url.label("url")),
+        select(User.background_image_url),
+        select(Season.image_url),
+        select(Event.image_url),
+        select(Track.image_url)
+    )
+    result = await db.execute(stmt)
+    referenced = set()
+    referenced_legacy = set()
+    for url in result.scalars():
+        if not url:
+            continue
+        if url.startswith(IMAGE_BLOB_URL_PREFIX):
+            referenced.add(url.rsplit("/", 1)[-1][:-len(IMAGE_FORMAT_SUFFIX)])
+        else:
+            referenced_legacy.update(image_variant_url(url, variant) for variant in IMAGE_VARIANTS)
+    removed = await run_in_threadpool(_remove_unreferenced_blobs, referenced)
+    return removed + await run_in_threadpool(_remove_unreferenced_legacy_images, referenced_legacy)
@@ -0,0 +1,192 @@
+from app.crud.competition import get_track_by_track_id
+from app.crud.race_record import get_best_durations_by_track
+from app.crud.user import get_users_by_ids
+from app.core.errors import ErrorCode
+from app.schemas.base import BizException
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardResponse, LeaderboardMyRankResponse
+from app.db.redis import redis_client
+from app.db.models import Track
+from app.db.session import AsyncSessionLocal, is_primary_session
+from app.services.image import image_variant_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import uuid4
+import asyncio
+
+LEADERBOARD_REBUILD_CHUNK = 1000
+LEADERBOARD_REBUILD_LOCK_SECONDS = 300
+LEADERBOARD_REBUILD_WAIT_SECONDS = 3
+
+
+# 排行榜以 Redis 有序集合维护：member 为 user_id，score 为该用户在赛道上的最好用时（越小越靠前）
+def _track_leaderboard_key(track_id: str):
+    return f"leaderboard:track:{track_id}"
+
+
+# 标记排行榜已从 race_records 完整构建过，未构建时读取会先触发一次重建
+def _track_leaderboard_ready_key(track_id: str):
+    return f"leaderboard:track:{track_id}:ready"
+
+
+# 重建锁，值为本次重建写入的临时 key
+def _track_leaderboard_lock_key(track_id: str):
+    return f"leaderboard:track:{track_id}:rebuild_lock"
+
+
+async def record_track_results(results: list[tuple[str, str, float]]):
+    # results: (track_id, user_id, duration_seconds)，ZADD LT 只在成绩更好时更新，O(log n)
+    results = [r for r in results if r[2] is not None]
+    if not results:
+        return
+    lock_keys = list({_track_leaderboard_lock_key(track_id) for track_id, _, _ in results})
+
+    # 赛道正在重建时同时写入重建中的临时 key，避免 RENAME 覆盖掉重建期间的新成绩；
+    # WATCH 锁 key，重建在读锁与写入之间完成切换时整体重试
+    async def _apply(pipe):
+        rebuild_keys = dict(zip(lock_keys, await pipe.mget(lock_keys)))
+        pipe.multi()
+        for track_id, user_id, duration in results:
+            pipe.zadd(_track_leaderboard_key(track_id), {user_id: duration}, lt=True)
+            tmp_key = rebuild_keys[_track_leaderboard_lock_key(track_id)]
+            if tmp_key:
+                pipe.zadd(tmp_key, {user_id: duration}, lt=True)
+                pipe.expire(tmp_key, LEADERBOARD_REBUILD_LOCK_SECONDS)
+
+    await redis_client.transaction(_apply, *lock_keys)
+
+
+async def rebuild_track_leaderboard(db: AsyncSession, track: Track) -> bool:
+    # db 必须是主库会话
+    key = _track_leaderboard_key(track.track_id)
+    lock_key = _track_leaderboard_lock_key(track.track_id)
+    # 每次重建使用独立的临时 key，锁的值即临时 key 名，供 record_track_results 双写
+    tmp_key = f"{key}:rebuild:{uuid4().hex}"
+    if not await redis_client.set(lock_key, tmp_key, nx=True, ex=LEADERBOARD_REBUILD_LOCK_SECONDS):
+        return False
+    # 先加锁再查询：查询快照之后提交的成绩一定能看到锁并写入临时 key
+    rows = await get_best_durations_by_track(db, track.id)
+    for i in range(0, len(rows), LEADERBOARD_REBUILD_CHUNK):
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zadd(tmp_key, dict(rows[i:i + LEADERBOARD_REBUILD_CHUNK]), lt=True)
+        pipe.expire(tmp_key, LEADERBOARD_REBUILD_LOCK_SECONDS)
+        await pipe.execute()
+
+    # 写临时 key 再 RENAME，重建期间读者始终看到完整的旧榜或新榜
+    async def _swap(pipe):
+        owner = await pipe.get(lock_key)
+        has_rows = await pipe.exists(tmp_key)
+        pipe.multi()
+        if owner != tmp_key:
+            # 锁已过期并可能被其他重建接手，本次结果作废
+            pipe.delete(tmp_key)
+            return False
+        if has_rows:
+            pipe.rename(tmp_key, key)
+            pipe.persist(key)
+        else:
+            pipe.delete(key)
+        pipe.set(_track_leaderboard_ready_key(track.track_id), 1)
+        pipe.delete(lock_key)
+        return True
+
+    return await redis_client.transaction(_swap, lock_key, tmp_key, value_from_callable=True)
+
+
+async def rebuild_track_leaderboard_service(db: AsyncSession, track_id: str):
+    track = await get_track_by_track_id(db, track_id)
+    if track is None:
+        raise BizException(code=ErrorCode.TRACK_NOT_FOUND, message="赛道不存在")
+    if not await rebuild_track_leaderboard(db, track):
+        raise BizException(code=ErrorCode.LEADERBOARD_REBUILDING, message="排行榜正在重建")
+
+
+async def _rebuild_for_read(db: AsyncSession, track_id: str) -> bool:
+    track = await get_track_by_track_id(db, track_id)
+    if track is None:
+        raise BizException(code=ErrorCode.TRACK_NOT_FOUND, message="赛道不存在")
+    return await rebuild_track_leaderboard(db, track)
+
+
+async def _ensure_track_leaderboard(db: AsyncSession, track_id: str):
+    ready_key = _track_leaderboard_ready_key(track_id)
+    if await redis_client.exists(ready_key):
+        return
+    if is_primary_session(db):
+        rebuilt = await _rebuild_for_read(db, track_id)
+    else:
+        # 读接口拿到的是从库会话时，重建改走主库，避免把滞后数据标记为 ready
+        async with AsyncSessionLocal() as primary_db:
+            rebuilt = await _rebuild_for_read(primary_db, track_id)
+    if rebuilt:
+        return
+    # 其他请求正在重建，短暂等待其完成；超时则直接读取当前榜单（实时成绩仍在持续写入）
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LEADERBOARD_REBUILD_WAIT_SECONDS
+    while loop.time() < deadline:
+        await asyncio.sleep(0.05)
+        if await redis_client.exists(ready_key):
+            return
+
+
+async def _to_entries(db: AsyncSession, items: list[tuple[str, float]], start_rank: int) -> list[LeaderboardEntry]:
+    users = await get_users_by_ids(db, [user_id for user_id, _ in items])
+    entries = []
+    for offset, (user_id, duration) in enumerate(items):
+        user = users.get(user_id)
+        if user is None:
+            continue
+        entries.append(LeaderboardEntry(
+            rank=start_rank + offset,
+            user_id=user_id,
+            nickname=user.nickname,
+            avatar_image_url=image_variant_url(user.avatar_image_url, "thumb"),
+            duration_seconds=duration
+        ))
+    return entries
+
+
+async def get_track_top_service(db: AsyncSession, track_id: str, limit: int) -> LeaderboardResponse:
+    await _ensure_track_leaderboard(db, track_id)
+    key = _track_leaderboard_key(track_id)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zrange(key, 0, limit - 1, withscores=True)
+    pipe.zcard(key)
+    items, total = await pipe.execute()
+    return LeaderboardResponse(
+        track_id=track_id,
+        total=total,
+        entries=await _to_entries(db, items, 1)
+    )
+
+
+async def get_track_my_rank_service(db: AsyncSession, track_id: str, user_id: str) -> LeaderboardMyRankResponse:
+    await _ensure_track_leaderboard(db, track_id)
+    key = _track_leaderboard_key(track_id)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zrank(key, user_id)
+    pipe.zscore(key, user_id)
+    pipe.zcard(key)
+    rank, score, total = await pipe.execute()
+    return LeaderboardMyRankResponse(
+        track_id=track_id,
+        total=total,
+        rank=rank + 1 if rank is not None else None,
+        duration_seconds=score
+    )
+
+
+async def get_track_around_me_service(db: AsyncSession, track_id: str, user_id: str, radius: int) -> LeaderboardResponse:
+    await _ensure_track_leaderboard(db, track_id)
+    key = _track_leaderboard_key(track_id)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zrank(key, user_id)
+    pipe.zcard(key)
+    rank, total = await pipe.execute()
+    if rank is None:
+        return LeaderboardResponse(track_id=track_id, total=total, entries=[])
+    start = max(0, rank - radius)
+    items = await redis_client.zrange(key, start, rank + radius, withscores=True)
+    return LeaderboardResponse(
+        track_id=track_id,
+        total=total,
+        entries=await _to_entries(db, items, start + 1)
+    )
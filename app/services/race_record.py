@@ -0,0 +1,60 @@
+from app.crud.race_record import get_user_db_ids, get_track_refs, bulk_insert_race_records, RACE_RECORD_STATUS_FINISHED
+from app.schemas.race_record import RaceRecordCreate, RaceRecordBatchResponse, RaceRecordError
+from app.crud.standings import apply_record_scores
+from app.services.leaderboard import record_track_results
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+
+
+async def ingest_race_records_service(db: AsyncSession, records: list[RaceRecordCreate]) -> RaceRecordBatchResponse:
+    # 整批只做两次集合查询校验用户和赛道，随后一条多行 INSERT 写入，一个事务提交
+    user_map = await get_user_db_ids(db, list({r.user_id for r in records}))
+    track_map = await get_track_refs(db, list({r.track_id for r in records}))
+
+    rows = []
+    errors = []
+    for index, record in enumerate(records):
+        user_db_id = user_map.get(record.user_id)
+        track_ref = track_map.get(record.track_id)
+        if user_db_id is None:
+            errors.append(RaceRecordError(index=index, message="用户不存在"))
+            continue
+        if track_ref is None:
+            errors.append(RaceRecordError(index=index, message="赛道不存在"))
+            continue
+        if record.end_time < record.start_time or record.duration_seconds < 0:
+            errors.append(RaceRecordError(index=index, message="比赛时间无效"))
+            continue
+        track_db_id, event_db_id, season_db_id = track_ref
+        rows.append({
+            "id": uuid.uuid4(),
+            "user_id": user_db_id,
+            "event_id": event_db_id,
+            "track_id": track_db_id,
+            "season_id": season_db_id,
+            "status": RACE_RECORD_STATUS_FINISHED,
+            "score": record.score,
+            "duration_seconds": record.duration_seconds,
+            "start_time": record.start_time,
+            "end_time": record.end_time,
+            "is_team": record.is_team,
+            "team_code": record.team_code
+        })
+
+    inserted = await bulk_insert_race_records(db, rows)
+    # 积分榜汇总与成绩在同一事务中更新
+    await apply_record_scores(db, inserted)
+    await db.commit()
+
+    # 只把实际写入的成绩增量推送到排行榜
+    user_public_ids = {db_id: user_id for user_id, db_id in user_map.items()}
+    track_public_ids = {ref[0]: track_id for track_id, ref in track_map.items()}
+    await record_track_results([
+        (track_public_ids[row.track_id], user_public_ids[row.user_id], row.duration_seconds)
+        for row in inserted
+    ])
+    return RaceRecordBatchResponse(
+        inserted=len(inserted),
+        duplicated=len(rows) - len(inserted),
+        errors=errors
+    )
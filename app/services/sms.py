@@ -1,11 +1,8 @@
 import random
-import redis.asyncio as aioredis
-from app.core.config import settings
+from app.db.redis import redis_client
 from app.core.errors import ErrorCode
 from app.schemas.base import BizException
 
-redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
-
 async def send_sms_code(phone_number: str):
     key = f"sms:{phone_number}"
     if await redis_client.get(key):
@@ -0,0 +1,61 @@
+from app.crud.standings import get_season_standings, get_event_standings
+from app.crud.competition import get_season_by_season_id, get_event_by_event_id
+from app.crud.user import get_user_by_id
+from app.core.errors import ErrorCode
+from app.schemas.base import BizException
+from app.schemas.leaderboard import StandingEntry, StandingsResponse
+from app.services.image import image_variant_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+
+async def _cursor_user_db_id(db: AsyncSession, cursor_id: Optional[str]):
+    if not cursor_id:
+        return None
+    user = await get_user_by_id(db, cursor_id)
+    if user is None:
+        raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
+    return user.id
+
+
+def _to_standings_response(rows, has_more: bool) -> StandingsResponse:
+    return StandingsResponse(
+        entries=[StandingEntry(
+            user_id=user.user_id,
+            nickname=user.nickname,
+            avatar_image_url=image_variant_url(user.avatar_image_url, "thumb"),
+            total_score=total_score,
+            track_count=track_count
+        ) for user, total_score, track_count in rows],
+        next_cursor_score=rows[-1][1] if rows else None,
+        next_cursor_id=rows[-1][0].user_id if rows else None,
+        has_more=has_more
+    )
+
+
+async def get_season_standings_service(
+    db: AsyncSession,
+    season_id: str,
+    limit: int = 20,
+    cursor_score: Optional[float] = None,
+    cursor_id: Optional[str] = None
+) -> StandingsResponse:
+    season = await get_season_by_season_id(db, season_id)
+    if season is None:
+        raise BizException(code=ErrorCode.SEASON_NOT_FOUND, message="赛季不存在")
+    rows, has_more = await get_season_standings(db, season.id, limit, cursor_score, await _cursor_user_db_id(db, cursor_id))
+    return _to_standings_response(rows, has_more)
+
+
+async def get_event_standings_service(
+    db: AsyncSession,
+    event_id: str,
+    limit: int = 20,
+    cursor_score: Optional[float] = None,
+    cursor_id: Optional[str] = None
+) -> StandingsResponse:
+    event = await get_event_by_event_id(db, event_id)
+    if event is None:
+        raise BizException(code=ErrorCode.EVENT_NOT_FOUND, message="赛事不存在")
+    rows, has_more = await get_event_standings(db, event.id, limit, cursor_score, await _cursor_user_db_id(db, cursor_id))
+    return _to_standings_response(rows, has_more)
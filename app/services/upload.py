@@ -0,0 +1,47 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from app.core.errors import ErrorCode
+from app.schemas.base import BizException
+
+USER_IMAGE_MAX_BYTES = 1 * 1024 * 1024  # 用户上传图片上限 1MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _open_temp_file(folder: Path):
+    folder.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".upload_", suffix=".tmp")
+    return os.fdopen(fd, "wb"), Path(tmp_path)
+
+
+def _discard_temp_file(f, tmp_path: Path):
+    f.close()
+    tmp_path.unlink(missing_ok=True)
+
+
+async def save_upload_file(
+    file: UploadFile,
+    folder: Path,
+    max_bytes: Optional[int] = None,
+    hasher=None
+) -> Path:
+    # 分块读取上传内容写入 folder 下唯一命名的临时文件并返回其路径，由调用方处理并删除；
+    # 所有磁盘操作都放到线程池，不阻塞事件循环。传入 hasher（如 hashlib.sha256()）时同时计算内容摘要
+    f, tmp_path = await run_in_threadpool(_open_temp_file, folder)
+    try:
+        size = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise BizException(code=ErrorCode.IMAGE_UPLOAD_OVERSIZE, message="上传图片体积超过限制")
+            if hasher is not None:
+                hasher.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(_discard_temp_file, f, tmp_path)
+        raise
+    await run_in_threadpool(f.close)
+    return tmp_path
@@ -1,16 +1,35 @@
-from app.crud.user import get_user_by_phone, create_user, get_user_by_id, update_user, delete_user_by_id
+from app.crud.user import get_user_by_phone, create_user, get_user_by_id, update_user, delete_user_by_id, search_users
 from app.core.security import create_access_token
-from app.schemas.user import UserUpdateForm, UserBaseInfo, UserRole
+from app.schemas.user import UserUpdateForm, UserBaseInfo, UserRole, UserRelationInfo, RelationshipStatus
+from app.crud.user_follow import get_user_profile_row, relationship_status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.base import BizException
 from app.core.errors import ErrorCode
+from app.db.redis import redis_client
+from app.schemas.user_follow import PersonInfoResponse
+from app.services.image import image_variant_url
+from app.db.session import mark_recent_write
+from typing import Optional
+
+USER_ROLE_CACHE_TTL_SECONDS = 60  # 角色变更（含撤销管理员）最多60秒后生效
+
+
+def _user_role_cache_key(user_id: str):
+    return f"user_role:{user_id}"
 
 async def login_or_register(phone_number: str, db: AsyncSession):
     isRegister = False
     user = await get_user_by_phone(db, phone_number)
     if not user:
         user = await create_user(db, phone_number)
-        isRegister = True
+        if user:
+            isRegister = True
+            await mark_recent_write(user.user_id)
+        else:
+            # 同一手机号被并发注册，读取已创建的用户
+            user = await get_user_by_phone(db, phone_number)
+            if not user:
+                raise BizException(code=ErrorCode.DATABASE_ERROR, message="注册失败，请重试")
     userInfo = UserBaseInfo.model_validate(user)
     token = create_access_token({"user_id": user.user_id})
     return token, userInfo, isRegister, UserRole(user.role)
@@ -21,12 +40,47 @@ async def get_user_role(user_id: str, db: AsyncSession):
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
     return UserRole(user.role)
 
+async def get_cached_user_role(user_id: str, db: AsyncSession) -> Optional[UserRole]:
+    # 内部API鉴权用，用户不存在时返回 None
+    key = _user_role_cache_key(user_id)
+    cached = await redis_client.get(key)
+    if cached:
+        return UserRole(cached)
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+    await redis_client.set(key, user.role, ex=USER_ROLE_CACHE_TTL_SECONDS)
+    return UserRole(user.role)
+
 async def get_user_info(user_id: str, db: AsyncSession):
     user = await get_user_by_id(db, user_id)
     if not user:
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
     return UserBaseInfo.model_validate(user)
 
+async def get_user_profile(user_id: str, db: AsyncSession, viewer_id: Optional[str] = None) -> tuple[UserBaseInfo, UserRelationInfo, RelationshipStatus]:
+    # 用户信息、关系计数、与查看者的关系由一条查询取回
+    row = await get_user_profile_row(db, user_id, viewer_id)
+    if not row:
+        raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
+    relation = UserRelationInfo(
+        follower=row.follower_count or 0,
+        followed=row.following_count or 0,
+        friends=row.friend_count or 0
+    )
+    return UserBaseInfo.model_validate(row[0]), relation, relationship_status(row.following, row.followed_by)
+
+async def search_users_service(keyword: str, db: AsyncSession, limit=20, cursor_id=None):
+    users, next_cursor_id, has_more = await search_users(db, keyword, limit, cursor_id)
+    items = [
+        PersonInfoResponse(
+            user_id=user.user_id,
+            avatar_image_url=image_variant_url(user.avatar_image_url, "thumb"),
+            nickname=user.nickname
+        ) for user in users
+    ]
+    return items, next_cursor_id, has_more
+
 async def update_user_info(user_id: str, form: UserUpdateForm, avatar_url: str, background_url: str, db: AsyncSession):
     user = await get_user_by_id(db, user_id)
     if not user:
@@ -35,6 +89,7 @@ async def update_user_info(user_id: str, form: UserUpdateForm, avatar_url: str,
     update_data["avatar_image_url"] = avatar_url
     update_data["background_image_url"] = background_url
     user = await update_user(db, user, update_data)
+    await mark_recent_write(user_id)
     return UserBaseInfo.model_validate(user)
 
 async def delete_user_info(user_id: str, db: AsyncSession):
@@ -42,4 +97,5 @@ async def delete_user_info(user_id: str, db: AsyncSession):
     if not user:
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
     await delete_user_by_id(db, user)
+    await redis_client.delete(_user_role_cache_key(user_id))
     return True
\ No newline at end of file
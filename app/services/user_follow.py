@@ -1,56 +1,108 @@
 from app.crud import user_follow
-from app.crud.user import get_user_by_id
-from app.schemas.user import UserRelationInfo
+from app.crud.user import get_user_by_id, get_users_by_ids
+from app.schemas.user import UserRelationInfo, RelationshipStatus
 from app.schemas.base import BizException
-from app.schemas.user_follow import PersonInfoResponse
+from app.schemas.user_follow import PersonInfoResponse, RelationshipItem
 from app.core.errors import ErrorCode
+from app.db.redis import redis_client
+from app.services.image import image_variant_url
+from app.db.session import mark_recent_write, is_primary_session
 from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import uuid4
+
+RELATIONSHIP_CACHE_TTL_SECONDS = 600  # 关系缓存10分钟过期，关注/取关时主动失效
+RELATIONSHIP_GENERATION_TTL_SECONDS = RELATIONSHIP_CACHE_TTL_SECONDS * 2
+
+
+def _relationship_cache_key(follower_id, followed_id):
+    return f"relationship:{follower_id}:{followed_id}"
+
+
+# 两个方向的关系共用一个版本号，关注/取关时更换为新的随机值
+def _relationship_generation_key(follower_id, followed_id):
+    a, b = sorted((follower_id, followed_id))
+    return f"relationship_gen:{a}:{b}"
+
+
+async def invalidate_relationship_cache(follower_id, followed_id):
+    # 缓存值带有回填时读到的版本号，更换版本号后，查询期间读到旧数据的并发回填也会被识别为失效
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(_relationship_generation_key(follower_id, followed_id), uuid4().hex, ex=RELATIONSHIP_GENERATION_TTL_SECONDS)
+    pipe.delete(
+        _relationship_cache_key(follower_id, followed_id),
+        _relationship_cache_key(followed_id, follower_id)
+    )
+    await pipe.execute()
+
 
 async def get_relation_count(db: AsyncSession, user_id):
-    user = await get_user_by_id(db, user_id)
-    if not user:
+    row = await user_follow.get_relation_count_row(db, user_id)
+    if not row:
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
-    # 使用user.id查询数据库
-    following_count = await user_follow.count_following(db, user.id)
-    follower_count = await user_follow.count_followers(db, user.id)
-    friend_count = await user_follow.count_friends(db, user.id)
     return UserRelationInfo (
-        follower=follower_count,
-        followed=following_count,
-        friends=friend_count
+        follower=row.follower_count or 0,
+        followed=row.following_count or 0,
+        friends=row.friend_count or 0
     )
 
 
 async def get_relationship_service(db: AsyncSession, follower_id, followed_id):
-    user_follower = await get_user_by_id(db, follower_id)
-    user_followed = await get_user_by_id(db, followed_id)
+    key = _relationship_cache_key(follower_id, followed_id)
+    # 先取版本号再查库，缓存值格式为 "<版本号>|<关系>"，版本号不一致视为未命中
+    cached, generation = await redis_client.mget(key, _relationship_generation_key(follower_id, followed_id))
+    generation = generation or ""
+    if cached:
+        cached_generation, _, cached_value = cached.partition("|")
+        if cached_generation == generation:
+            return RelationshipStatus(cached_value)
+    users = await get_users_by_ids(db, [follower_id, followed_id])
+    user_follower = users.get(follower_id)
+    user_followed = users.get(followed_id)
     if not user_followed:
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
     relationship = await user_follow.get_relationship_crud(db, user_follower.id, user_followed.id)
+    # 从库查询结果可能滞后于刚发生的关注/取关，不回填缓存
+    if is_primary_session(db):
+        await redis_client.set(key, f"{generation}|{relationship.value}", ex=RELATIONSHIP_CACHE_TTL_SECONDS)
     return relationship
 
 
+async def get_relationships_service(db: AsyncSession, user_id, target_user_ids):
+    target_user_ids = list(dict.fromkeys(target_user_ids))
+    relationships = await user_follow.get_relationships_crud(db, user_id, target_user_ids)
+    return [
+        RelationshipItem(user_id=target_id, relationship=relationships[target_id])
+        for target_id in target_user_ids if target_id in relationships
+    ]
+
+
 async def follow_user(db: AsyncSession, follower_id, followed_id):
     if follower_id == followed_id:
         raise BizException(code=ErrorCode.USER_FOLLOW_SELF, message="不能关注自己")
-    user_follower = await get_user_by_id(db, follower_id)
-    user_followed = await get_user_by_id(db, followed_id)
+    users = await get_users_by_ids(db, [follower_id, followed_id])
+    user_follower = users.get(follower_id)
+    user_followed = users.get(followed_id)
     if not user_followed:
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
     already_following = await user_follow.is_following(db, user_follower.id, user_followed.id)
     if already_following:
         raise BizException(code=ErrorCode.USER_FOLLOW_REPEAT, message="请勿重复关注")
     await user_follow.create_follow(db, user_follower.id, user_followed.id)
+    await invalidate_relationship_cache(follower_id, followed_id)
+    await mark_recent_write(follower_id, followed_id)
 
 
 async def cancel_follow_user(db: AsyncSession, follower_id, followed_id):
     if follower_id == followed_id:
         raise BizException(code=ErrorCode.USER_FOLLOW_SELF, message="不能取消关注自己")
-    user_follower = await get_user_by_id(db, follower_id)
-    user_followed = await get_user_by_id(db, followed_id)
+    users = await get_users_by_ids(db, [follower_id, followed_id])
+    user_follower = users.get(follower_id)
+    user_followed = users.get(followed_id)
     if not user_followed:
         raise BizException(code=ErrorCode.USER_NOT_FOUND, message="用户不存在")
     await user_follow.remove_follow(db, user_follower.id, user_followed.id)
+    await invalidate_relationship_cache(follower_id, followed_id)
+    await mark_recent_write(follower_id, followed_id)
 
 
 async def get_following_list(db: AsyncSession, user_id, limit=20, cursor_created_at=None, cursor_id=None, search=None):
@@ -67,7 +119,7 @@ async def get_following_list(db: AsyncSession, user_id, limit=20, cursor_created
     items = [
         PersonInfoResponse(
             user_id=user.user_id,
-            avatar_image_url=user.avatar_image_url,
+            avatar_image_url=image_variant_url(user.avatar_image_url, "thumb"),
             nickname=user.nickname
         ) for user in users
     ]
@@ -88,7 +140,7 @@ async def get_follower_list(db: AsyncSession, user_id, limit=20, cursor_created_
     items = [
         PersonInfoResponse(
             user_id=user.user_id,
-            avatar_image_url=user.avatar_image_url,
+            avatar_image_url=image_variant_url(user.avatar_image_url, "thumb"),
             nickname=user.nickname
         ) for user in users
     ]
@@ -109,7 +161,7 @@ async def get_friend_list(db: AsyncSession, user_id, limit=20, cursor_created_at
     items = [
         PersonInfoResponse(
             user_id=user.user_id,
-            avatar_image_url=user.avatar_image_url,
+            avatar_image_url=image_variant_url(user.avatar_image_url, "thumb"),
             nickname=user.nickname
         ) for user in users
     ]
@@ -0,0 +1,66 @@
+from sqlalchemy.dialects import postgresql
+
+
+def compile_pg(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return list(self._rows)
+
+    def scalars(self):
+        return self
+
+    def scalar(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar_one_or_none(self):
+        return self.scalar()
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class FakeSession:
+    # 记录执行过的语句，按顺序返回预置结果，用于不依赖数据库的 crud 测试
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.info = {}
+
+    def _next(self, stmt):
+        self.statements.append(stmt)
+        result = self.results.pop(0) if self.results else []
+        if isinstance(result, Exception):
+            raise result
+        return FakeResult(result)
+
+    async def execute(self, stmt, *args, **kwargs):
+        return self._next(stmt)
+
+    async def scalars(self, stmt, *args, **kwargs):
+        return self._next(stmt)
+
+    async def scalar(self, stmt, *args, **kwargs):
+        return self._next(stmt).scalar()
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    def add(self, obj):
+        pass
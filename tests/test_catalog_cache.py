@@ -0,0 +1,62 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from app.services import catalog_cache
+
+
+class Listing(BaseModel):
+    items: list[str]
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    catalog_cache._local_cache.clear()
+    yield
+    catalog_cache._local_cache.clear()
+
+
+def _loader(values):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return Listing(items=list(values))
+
+    return load, calls
+
+
+async def test_listing_is_cached_until_version_bump(fake_redis):
+    values = ["a"]
+    load, calls = _loader(values)
+    assert (await catalog_cache.get_or_load_catalog("events", {"p": 1}, Listing, load)).items == ["a"]
+    assert (await catalog_cache.get_or_load_catalog("events", {"p": 1}, Listing, load)).items == ["a"]
+    assert len(calls) == 1
+    await catalog_cache.bump_catalog_version()
+    await catalog_cache.get_or_load_catalog("events", {"p": 1}, Listing, load)
+    assert len(calls) == 2
+
+
+async def test_lost_version_key_never_reuses_an_old_version(fake_redis):
+    first = await catalog_cache.get_catalog_version()
+    assert await catalog_cache.get_catalog_version() == first
+    await fake_redis.flushall()
+    second = await catalog_cache.get_catalog_version()
+    assert second != first
+    await catalog_cache.bump_catalog_version()
+    assert await catalog_cache.get_catalog_version() not in (first, second)
+
+
+async def test_local_entries_expire_when_another_worker_bumps(fake_redis, monkeypatch):
+    load, calls = _loader(["a"])
+    await catalog_cache.get_or_load_catalog("events", {}, Listing, load)
+    # 模拟版本号丢失后被重新初始化为与本进程缓存相同的值：本地条目也只在 TTL 内有效
+    version = await catalog_cache.get_catalog_version()
+    await fake_redis.flushall()
+    await fake_redis.set(catalog_cache.CATALOG_VERSION_KEY, version)
+    later = time.monotonic() + catalog_cache.CATALOG_LOCAL_CACHE_TTL_SECONDS + 1
+    monkeypatch.setattr(catalog_cache, "time", SimpleNamespace(monotonic=lambda: later))
+    await catalog_cache.get_or_load_catalog("events", {}, Listing, load)
+    assert len(calls) == 2
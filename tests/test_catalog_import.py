@@ -0,0 +1,116 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.crud import competition as competition_crud
+from app.core.errors import ErrorCode
+from app.schemas.base import BizException
+from app.schemas.competition import CatalogImportRequest
+from app.services import competition as competition_service
+from tests.fakes import FakeSession
+
+ASYNCPG_MAX_PARAMS = 32767
+
+
+def _track_row(i):
+    return {
+        "id": uuid.uuid4(), "track_id": f"track_{i}", "name": f"track {i}",
+        "start_date": datetime(2025, 1, 1), "end_date": datetime(2025, 1, 2), "event_id": uuid.uuid4(),
+        "from_lat": 30.0, "from_lng": 120.0, "to_lat": 30.1, "to_lng": 120.1, "from_geohash": "wtmk",
+        "elevation_difference": 0, "sub_region_name": "x", "fee": 0, "prize_pool": 0, "image_url": "/p.png"
+    }
+
+
+async def test_bulk_insert_is_chunked_below_parameter_limit():
+    db = FakeSession()
+    await competition_crud.bulk_create_catalog_crud(db, [], [], [_track_row(i) for i in range(2000)])
+    assert len(db.statements) == 2000 // competition_crud.CATALOG_INSERT_CHUNK
+    for stmt in db.statements:
+        assert len(stmt.compile().params) < ASYNCPG_MAX_PARAMS
+    assert db.commits == 1
+
+
+async def test_bulk_insert_rolls_back_on_unique_violation():
+    db = FakeSession([[], IntegrityError("INSERT", {}, Exception("duplicate key"))])
+    with pytest.raises(IntegrityError):
+        await competition_crud.bulk_create_catalog_crud(db, [], [], [_track_row(i) for i in range(600)])
+    assert db.rollbacks == 1
+    assert db.commits == 0
+
+
+def _request():
+    return CatalogImportRequest(
+        seasons=[
+            {"name": "S1", "start_date": "2025-01-01", "end_date": "2025-12-31", "sport_type": "bike"},
+            {"name": "S0", "start_date": "2025-01-01", "end_date": "2025-12-31", "sport_type": "bike"},
+        ],
+        events=[
+            {"name": "E1", "start_date": "2025-02-01", "end_date": "2025-02-02", "season_name": "S1", "region_name": "R1", "sport_type": "bike"},
+            {"name": "E2", "start_date": "2025-02-01", "end_date": "2025-02-02", "season_name": "S9", "region_name": "R1", "sport_type": "bike"},
+        ],
+        tracks=[
+            {"name": "T1", "start_date": "2025-02-01", "end_date": "2025-02-02", "event_name": "E1", "from_latitude": 30, "from_longitude": 120, "to_latitude": 30.1, "to_longitude": 120.1, "sub_region_name": "x"},
+            {"name": "T1", "start_date": "2025-02-01", "end_date": "2025-02-02", "event_name": "E1", "from_latitude": 30, "from_longitude": 120, "to_latitude": 30.1, "to_longitude": 120.1, "sub_region_name": "x"},
+        ]
+    )
+
+
+@pytest.fixture
+def catalog_db(monkeypatch):
+    # 已存在赛季 S0 与地区 R1；导入前须先获取导入锁
+    calls = []
+
+    async def lock_catalog_import(db):
+        calls.append("lock")
+
+    async def get_seasons_by_name_and_sport_type(db, keys):
+        calls.append("resolve")
+        return {("S0", "bike"): uuid.uuid4()}
+
+    async def get_region_ids_by_names(db, names):
+        return {"R1": uuid.uuid4()}
+
+    async def get_event_ids_by_names(db, names):
+        return {}
+
+    async def get_existing_track_names(db, names):
+        return set()
+
+    async def bump_catalog_version():
+        calls.append("bump")
+
+    for fn in (lock_catalog_import, get_seasons_by_name_and_sport_type, get_region_ids_by_names,
+               get_event_ids_by_names, get_existing_track_names, bump_catalog_version):
+        monkeypatch.setattr(competition_service, fn.__name__, fn)
+    return calls
+
+
+async def test_import_resolves_rows_created_in_the_same_batch(catalog_db, monkeypatch):
+    inserted = {}
+
+    async def bulk_create_catalog_crud(db, seasons, events, tracks):
+        inserted.update(seasons=seasons, events=events, tracks=tracks)
+
+    monkeypatch.setattr(competition_service, "bulk_create_catalog_crud", bulk_create_catalog_crud)
+    result = await competition_service.import_catalog_service(None, _request())
+    assert (result.seasons, result.events, result.tracks) == (1, 1, 1)
+    assert [(e.kind, e.index, e.message) for e in result.errors] == [
+        ("season", 1, "赛季已存在"), ("event", 1, "赛季不存在"), ("track", 1, "赛道已存在")
+    ]
+    assert inserted["events"][0]["season_id"] == inserted["seasons"][0]["id"]
+    assert inserted["tracks"][0]["event_id"] == inserted["events"][0]["id"]
+    assert catalog_db == ["lock", "resolve", "bump"]
+
+
+async def test_import_conflict_is_reported_as_biz_error(catalog_db, monkeypatch):
+    async def bulk_create_catalog_crud(db, seasons, events, tracks):
+        raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    monkeypatch.setattr(competition_service, "bulk_create_catalog_crud", bulk_create_catalog_crud)
+    with pytest.raises(BizException) as exc_info:
+        await competition_service.import_catalog_service(None, _request())
+    assert exc_info.value.status_code == 200
+    assert exc_info.value.detail["code"] == ErrorCode.CATALOG_IMPORT_CONFLICT
+    assert "bump" not in catalog_db
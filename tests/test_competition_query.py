@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.crud import competition as competition_crud
+from tests.fakes import FakeResult, FakeSession, compile_pg
+
+
+class FakeConnection:
+    def __init__(self, plan_rows):
+        self.plan_rows = plan_rows
+        self.sql = []
+
+    async def exec_driver_sql(self, sql):
+        self.sql.append(sql)
+        return FakeResult([json.dumps([{"Plan": {"Plan Rows": self.plan_rows}}])])
+
+
+class FakeBind:
+    dialect = asyncpg_dialect()
+
+
+class ExplainSession(FakeSession):
+    def __init__(self, results=(), plan_rows=0):
+        super().__init__(results)
+        self.conn = FakeConnection(plan_rows)
+
+    def get_bind(self):
+        return FakeBind()
+
+    async def connection(self):
+        return self.conn
+
+
+async def test_estimate_row_count_keeps_literal_filters_intact():
+    db = ExplainSession(plan_rows=42)
+    stmt = competition_crud.select(competition_crud.Event).where(
+        competition_crud.name_contains(competition_crud.Event.name, "a:word 50%")
+    )
+    assert await competition_crud.estimate_row_count(db, stmt) == 42
+    sql = db.conn.sql[0]
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    # 原样交给驱动执行：:word 不会被当作绑定参数，% 不会被转义成 %%
+    assert "'a:word 50/%'" in sql
+    assert "%%" not in sql
+
+
+async def test_query_events_pages_by_created_at_and_id_cursor():
+    rows = [object() for _ in range(3)]
+    db = ExplainSession([rows], plan_rows=7)
+    cursor = datetime(2025, 1, 1)
+    events, has_more, total = await competition_crud.query_events_crud(
+        db, None, None, None, "race", size=2, cursor_created_at=cursor, cursor_id="event_1", with_total=True
+    )
+    assert events == rows[:2]
+    assert has_more is True
+    assert total == 7
+    sql = compile_pg(db.statements[0])
+    assert "(events.created_at, events.event_id) > ('2025-01-01 00:00:00', 'event_1')" in sql
+    assert "ORDER BY events.created_at ASC, events.event_id ASC" in sql
+    assert "LIMIT 3" in sql
+    assert "OFFSET" not in sql
+
+
+async def test_query_events_last_page_has_no_more():
+    rows = [object()]
+    db = ExplainSession([rows])
+    events, has_more, total = await competition_crud.query_events_crud(db, None, None, None, None, size=2)
+    assert (events, has_more, total) == (rows, False, None)
+    assert db.conn.sql == []
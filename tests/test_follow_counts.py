@@ -0,0 +1,59 @@
+import uuid
+
+import pytest
+
+from app.crud import user_follow as follow_crud
+from tests.fakes import FakeSession, compile_pg
+
+A, B = uuid.uuid4(), uuid.uuid4()
+
+
+@pytest.fixture
+def bumps(monkeypatch):
+    captured = []
+
+    async def _bump_relation_counts(db, deltas):
+        captured.append({d["user_id"]: (d["following_count"], d["follower_count"], d["friend_count"]) for d in deltas})
+
+    monkeypatch.setattr(follow_crud, "_bump_relation_counts", _bump_relation_counts)
+    return captured
+
+
+def _lock_sql(db):
+    sql = compile_pg(db.statements[0])
+    assert "pg_advisory_xact_lock(hashtextextended(" in sql
+    return sql
+
+
+async def test_follow_takes_the_same_pair_lock_in_both_directions(bumps):
+    db_ab, db_ba = FakeSession(), FakeSession()
+    await follow_crud.create_follow(db_ab, A, B)
+    await follow_crud.create_follow(db_ba, B, A)
+    assert _lock_sql(db_ab) == _lock_sql(db_ba)
+    db_other = FakeSession()
+    await follow_crud.create_follow(db_other, A, uuid.uuid4())
+    assert _lock_sql(db_other) != _lock_sql(db_ab)
+
+
+async def test_follow_counts_depend_on_reverse_follow_seen_after_lock(bumps):
+    # 结果依次对应：加锁、查询反向关注
+    await follow_crud.create_follow(FakeSession([[], []]), A, B)
+    await follow_crud.create_follow(FakeSession([[], [uuid.uuid4()]]), B, A)
+    assert bumps == [
+        {A: (1, 0, 0), B: (0, 1, 0)},
+        {B: (0, -1, 1), A: (-1, 0, 1)},
+    ]
+
+
+async def test_unfollow_locks_pair_and_reverts_friendship(bumps):
+    db = FakeSession([[], [uuid.uuid4()], [uuid.uuid4()]])
+    await follow_crud.remove_follow(db, A, B)
+    _lock_sql(db)
+    assert bumps == [{A: (0, 1, -1), B: (1, 0, -1)}]
+    assert db.commits == 1
+
+
+async def test_unfollow_of_missing_follow_changes_nothing(bumps):
+    db = FakeSession([[], []])
+    await follow_crud.remove_follow(db, A, B)
+    assert bumps == []
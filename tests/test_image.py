@@ -0,0 +1,101 @@
+import io
+import os
+import stat
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from app.core.errors import ErrorCode
+from app.schemas.base import BizException
+from app.services import image
+
+
+def test_concurrent_identical_transcodes_both_succeed(tmp_path):
+    src = tmp_path / "src.png"
+    Image.new("RGB", (300, 200), "red").save(src)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(image.transcode_image, str(src), str(tmp_path), "abc") for _ in range(4)]
+        for future in futures:
+            future.result()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["abc.webp", "abc_medium.webp", "abc_thumb.webp", "src.png"]
+    assert stat.S_IMODE((tmp_path / "abc.webp").stat().st_mode) == 0o644
+
+
+def test_gc_removes_unreferenced_legacy_images(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    old = time.time() - image.IMAGE_BLOB_GC_GRACE_SECONDS - 60
+    kept = image.IMAGE_LEGACY_ROOT / "event/event_1"
+    dropped = image.IMAGE_LEGACY_ROOT / "track/track_1"
+    for folder in (kept, dropped):
+        folder.mkdir(parents=True)
+    files = [kept / "bg_1.webp", kept / "bg_1_thumb.webp", kept / "bg_0.png", dropped / "bg_2.png"]
+    for file in files:
+        file.write_bytes(b"x")
+        os.utime(file, (old, old))
+    fresh = kept / "bg_3.png"
+    fresh.write_bytes(b"x")
+
+    referenced = {image.image_variant_url("/resources/event/event_1/bg_1.webp", v) for v in image.IMAGE_VARIANTS}
+    assert image._remove_unreferenced_legacy_images(referenced) == 2
+    assert sorted(p.name for p in kept.iterdir()) == ["bg_1.webp", "bg_1_thumb.webp", "bg_3.png"]
+    assert not dropped.exists()
+
+
+class _InlinePool:
+    # 在当前进程内同步执行的"进程池"，broken=True 时模拟子进程已崩溃
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("worker died"))
+        else:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def _upload(path):
+    return UploadFile(io.BytesIO(path.read_bytes()), filename=path.name)
+
+
+@pytest.fixture
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(image, "IMAGE_BLOB_DIR", tmp_path / "blobs")
+    return tmp_path / "blobs"
+
+
+async def test_broken_pool_is_replaced_and_upload_retried(tmp_path, blob_dir, monkeypatch):
+    pools = [_InlinePool(broken=True), _InlinePool()]
+    broken = pools[0]
+    monkeypatch.setattr(image, "_image_pool", None)
+    monkeypatch.setattr(image, "ProcessPoolExecutor", lambda max_workers: pools.pop(0))
+    src = tmp_path / "a.png"
+    Image.new("RGB", (64, 64), "blue").save(src)
+    url = await image.save_image(_upload(src))
+    assert (blob_dir / url.removeprefix(image.IMAGE_BLOB_URL_PREFIX)).exists()
+    assert broken.shut_down
+    assert image._image_pool is not broken
+
+
+async def test_image_over_pixel_limit_is_rejected_as_oversize(tmp_path, blob_dir, monkeypatch):
+    monkeypatch.setattr(image, "_image_pool", _InlinePool())
+    src = tmp_path / "huge.png"
+    # 1 位图：文件很小，解码后像素数超过上限
+    Image.new("1", (5000, 4000)).save(src)
+    with pytest.raises(BizException) as exc_info:
+        await image.save_image(_upload(src))
+    assert exc_info.value.detail["code"] == ErrorCode.IMAGE_UPLOAD_OVERSIZE
+    assert list(blob_dir.glob("*/*")) == []
@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.base import BizException
+from app.services import leaderboard
+
+
+TRACK = SimpleNamespace(id=1, track_id="T1")
+KEY = "leaderboard:track:T1"
+
+
+def _fake_best_durations(monkeypatch, rows, started=None, release=None):
+    async def get_best_durations_by_track(db, track_db_id):
+        if started is not None:
+            started.set()
+        if release is not None:
+            await release.wait()
+        return rows
+
+    monkeypatch.setattr(leaderboard, "get_best_durations_by_track", get_best_durations_by_track)
+
+
+async def test_record_track_results_keeps_best_duration(fake_redis):
+    await leaderboard.record_track_results([("T1", "u1", 60.0)])
+    await leaderboard.record_track_results([("T1", "u1", 70.0), ("T1", "u2", None)])
+    await leaderboard.record_track_results([("T1", "u1", 55.0)])
+    assert await fake_redis.zrange(KEY, 0, -1, withscores=True) == [("u1", 55.0)]
+
+
+async def test_rebuild_replaces_board_and_marks_ready(fake_redis, monkeypatch):
+    await fake_redis.zadd(KEY, {"stale": 1.0})
+    _fake_best_durations(monkeypatch, [("u1", 60.0), ("u2", 50.0)])
+    assert await leaderboard.rebuild_track_leaderboard(None, TRACK)
+    assert await fake_redis.zrange(KEY, 0, -1, withscores=True) == [("u2", 50.0), ("u1", 60.0)]
+    assert await fake_redis.ttl(KEY) == -1
+    assert await fake_redis.exists(f"{KEY}:ready")
+    assert not await fake_redis.exists(f"{KEY}:rebuild_lock")
+    assert await fake_redis.keys(f"{KEY}:rebuild:*") == []
+
+
+async def test_concurrent_rebuild_is_rejected_without_clobbering(fake_redis, monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    _fake_best_durations(monkeypatch, [("u1", 60.0)], started, release)
+
+    async def get_track_by_track_id(db, track_id):
+        return TRACK
+
+    monkeypatch.setattr(leaderboard, "get_track_by_track_id", get_track_by_track_id)
+    first = asyncio.create_task(leaderboard.rebuild_track_leaderboard(None, TRACK))
+    await started.wait()
+    assert not await leaderboard.rebuild_track_leaderboard(None, TRACK)
+    with pytest.raises(BizException):
+        await leaderboard.rebuild_track_leaderboard_service(None, "T1")
+    release.set()
+    assert await first
+    assert await fake_redis.zrange(KEY, 0, -1, withscores=True) == [("u1", 60.0)]
+
+
+async def test_results_recorded_during_rebuild_survive_rename(fake_redis, monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    # 查询快照中 u1 为 60 秒，之后又提交了 u1 的 40 秒与新用户 u2
+    _fake_best_durations(monkeypatch, [("u1", 60.0)], started, release)
+    task = asyncio.create_task(leaderboard.rebuild_track_leaderboard(None, TRACK))
+    await started.wait()
+    await leaderboard.record_track_results([("T1", "u1", 40.0), ("T1", "u2", 45.0)])
+    release.set()
+    assert await task
+    assert await fake_redis.zrange(KEY, 0, -1, withscores=True) == [("u1", 40.0), ("u2", 45.0)]
+
+
+async def test_results_recorded_during_empty_rebuild_survive(fake_redis, monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    _fake_best_durations(monkeypatch, [], started, release)
+    task = asyncio.create_task(leaderboard.rebuild_track_leaderboard(None, TRACK))
+    await started.wait()
+    await leaderboard.record_track_results([("T1", "u1", 40.0)])
+    release.set()
+    assert await task
+    assert await fake_redis.zrange(KEY, 0, -1, withscores=True) == [("u1", 40.0)]
+
+
+async def test_rebuild_discarded_when_lock_expired(fake_redis, monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    _fake_best_durations(monkeypatch, [("u1", 60.0)], started, release)
+    await fake_redis.zadd(KEY, {"u9": 30.0})
+    task = asyncio.create_task(leaderboard.rebuild_track_leaderboard(None, TRACK))
+    await started.wait()
+    await fake_redis.delete(f"{KEY}:rebuild_lock")
+    release.set()
+    assert not await task
+    assert await fake_redis.zrange(KEY, 0, -1, withscores=True) == [("u9", 30.0)]
+    assert not await fake_redis.exists(f"{KEY}:ready")
+    assert await fake_redis.keys(f"{KEY}:rebuild:*") == []
+
+
+async def test_cold_read_on_replica_rebuilds_from_primary(fake_redis, monkeypatch):
+    replica_db, primary_db = object(), object()
+    used = []
+
+    class FakePrimarySession:
+        async def __aenter__(self):
+            return primary_db
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def get_track_by_track_id(db, track_id):
+        used.append(db)
+        return TRACK
+
+    monkeypatch.setattr(leaderboard, "is_primary_session", lambda db: db is primary_db)
+    monkeypatch.setattr(leaderboard, "AsyncSessionLocal", FakePrimarySession)
+    monkeypatch.setattr(leaderboard, "get_track_by_track_id", get_track_by_track_id)
+    _fake_best_durations(monkeypatch, [("u1", 60.0)])
+    await leaderboard._ensure_track_leaderboard(replica_db, "T1")
+    assert used == [primary_db]
+    assert await fake_redis.exists(f"{KEY}:ready")
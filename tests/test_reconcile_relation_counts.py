@@ -0,0 +1,137 @@
+import asyncio
+import uuid
+from collections import defaultdict
+
+import pytest
+
+from app.crud import user_follow as follow_crud
+from tests.fakes import FakeResult, FakeSession, compile_pg
+
+A, B = sorted([uuid.uuid4(), uuid.uuid4()])
+
+
+class MemoryStore:
+    # 只模拟本测试需要的语义：已提交的关注、计数行与计数行上的行锁
+    def __init__(self, follows):
+        self.follows = set(follows)
+        self.counts = {}
+        self.row_locks = defaultdict(asyncio.Lock)
+
+
+class MemorySession:
+    def __init__(self, store):
+        self.store = store
+        self.held = []
+        self.pending_follows = set()
+        self.info = {}
+        self.before_commit = None
+
+    async def lock_row(self, user_id):
+        lock = self.store.row_locks[user_id]
+        if lock not in self.held:
+            await lock.acquire()
+            self.held.append(lock)
+
+    async def execute(self, stmt, *args, **kwargs):
+        return FakeResult([])
+
+    def add(self, follow):
+        self.pending_follows.add((follow.follower_id, follow.followed_id))
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        if self.before_commit is not None:
+            await self.before_commit()
+        self.store.follows |= self.pending_follows
+        self.pending_follows = set()
+        for lock in self.held:
+            lock.release()
+        self.held = []
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryStore({(A, B)})
+    store.counts = {A: (1, 0, 0), B: (0, 1, 0)}
+
+    async def is_following(db, follower_id, followed_id):
+        return (follower_id, followed_id) in store.follows | db.pending_follows
+
+    async def _bump_relation_counts(db, deltas):
+        for d in sorted(deltas, key=lambda d: d["user_id"]):
+            await db.lock_row(d["user_id"])
+            counts = store.counts.get(d["user_id"], (0, 0, 0))
+            store.counts[d["user_id"]] = (
+                counts[0] + d["following_count"], counts[1] + d["follower_count"], counts[2] + d["friend_count"]
+            )
+
+    async def _lock_relation_count_rows(db, user_db_ids):
+        for user_db_id in sorted(user_db_ids):
+            await db.lock_row(user_db_id)
+            store.counts.setdefault(user_db_id, (0, 0, 0))
+
+    async def _recount_relation_counts(db, user_db_ids):
+        # 只能看到已提交的关注
+        for user_db_id in user_db_ids:
+            following = {b for a, b in store.follows if a == user_db_id}
+            followers = {a for a, b in store.follows if b == user_db_id}
+            friends = len(following & followers)
+            store.counts[user_db_id] = (len(following) - friends, len(followers) - friends, friends)
+
+    for fn in (is_following, _bump_relation_counts, _lock_relation_count_rows, _recount_relation_counts):
+        monkeypatch.setattr(follow_crud, fn.__name__, fn)
+    return store
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_follow_committing_during_reconcile_keeps_its_delta(store, monkeypatch):
+    follow_db = MemorySession(store)
+    follow_task = None
+    recount = follow_crud._recount_relation_counts
+
+    async def recount_while_follow_in_flight(db, user_db_ids):
+        # 计数行已加锁：B 回关 A 插入关注后阻塞在计数行上，重算看不到这条未提交的关注
+        nonlocal follow_task
+        follow_task = asyncio.create_task(follow_crud.create_follow(follow_db, B, A))
+        await _settle()
+        assert not follow_task.done()
+        await recount(db, user_db_ids)
+
+    monkeypatch.setattr(follow_crud, "_recount_relation_counts", recount_while_follow_in_flight)
+    await follow_crud.rebuild_relation_counts(MemorySession(store), [A, B])
+    await follow_task
+    assert store.counts == {A: (0, 0, 1), B: (0, 0, 1)}
+
+
+async def test_reconcile_waits_for_follow_that_already_bumped(store):
+    follow_db = MemorySession(store)
+    release_commit = asyncio.Event()
+
+    async def wait_for_release():
+        await release_commit.wait()
+
+    follow_db.before_commit = wait_for_release
+    follow_task = asyncio.create_task(follow_crud.create_follow(follow_db, B, A))
+    await _settle()
+    reconcile_task = asyncio.create_task(follow_crud.rebuild_relation_counts(MemorySession(store), [A, B]))
+    await _settle()
+    # 关注事务持有计数行锁未提交，重算被阻塞
+    assert not reconcile_task.done()
+    release_commit.set()
+    await asyncio.gather(follow_task, reconcile_task)
+    assert store.counts == {A: (0, 0, 1), B: (0, 0, 1)}
+
+
+async def test_count_rows_are_created_then_locked_in_user_order():
+    db = FakeSession()
+    await follow_crud._lock_relation_count_rows(db, [A, B])
+    insert_sql, lock_sql = (compile_pg(stmt) for stmt in db.statements)
+    assert "ON CONFLICT (user_id) DO NOTHING" in insert_sql
+    assert "ORDER BY user_relation_counts.user_id" in lock_sql
+    assert lock_sql.endswith("FOR UPDATE")
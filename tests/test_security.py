@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.errors import ErrorCode
+from app.schemas.base import BizException
+
+
+def _token(expires_in: timedelta) -> str:
+    exp = datetime.now(timezone.utc) + expires_in
+    return jwt.encode({"user_id": "u1", "exp": exp}, settings.SECRET_KEY, algorithm=security.ALGORITHM)
+
+
+def test_valid_token_is_cached_and_refreshed_once():
+    token = _token(timedelta(days=1))
+    first = security.verify_token(token)
+    second = security.verify_token(token)
+    assert first["payload"]["user_id"] == "u1"
+    assert first["new_token"] is not None
+    assert second["new_token"] == first["new_token"]
+
+
+def test_expired_token_raises_token_expired_without_cache():
+    with pytest.raises(BizException) as exc_info:
+        security.verify_token(_token(timedelta(seconds=-10)))
+    assert exc_info.value.detail["code"] == ErrorCode.TOKEN_EXPIRED
+
+
+def test_token_expiring_after_cache_raises_token_expired(monkeypatch):
+    token = _token(timedelta(days=30))
+    security.verify_token(token)
+    later = datetime.now(timezone.utc) + timedelta(days=31)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return later
+
+    monkeypatch.setattr(security, "datetime", FrozenDatetime)
+    with pytest.raises(BizException) as exc_info:
+        security.verify_token(token)
+    assert exc_info.value.detail["code"] == ErrorCode.TOKEN_EXPIRED
+
+
+def test_tampered_token_is_invalid():
+    assert security.verify_token(_token(timedelta(days=1)) + "x") is None
@@ -0,0 +1,55 @@
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core.config import CustomStaticFiles
+
+
+def _client(root):
+    return TestClient(Starlette(routes=[Mount("/resources", app=CustomStaticFiles(directory=root))]))
+
+
+def test_replaced_file_is_served_with_fresh_metadata(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"12345")
+    client = _client(tmp_path)
+    assert client.get("/resources/a.png").content == b"12345"
+    (tmp_path / "a.png").write_bytes(b"1234567890")
+    response = client.get("/resources/a.png")
+    assert response.headers["content-length"] == "10"
+    assert response.content == b"1234567890"
+    (tmp_path / "a.png").unlink()
+    assert client.get("/resources/a.png").status_code == 404
+
+
+def test_blob_metadata_is_cached_and_missing_blobs_are_not(tmp_path):
+    blob = tmp_path / "blobs" / "ab" / "abcd.webp"
+    blob.parent.mkdir(parents=True)
+    client = _client(tmp_path)
+    assert client.get("/resources/blobs/ab/abcd.webp").status_code == 404
+    blob.write_bytes(b"webp")
+    response = client.get("/resources/blobs/ab/abcd.webp")
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"abcd"'
+    assert client.get("/resources/blobs/ab/abcd.webp", headers={"If-None-Match": '"abcd"'}).status_code == 304
+
+
+def test_placeholder_lookups_are_cached_including_missing_webp(tmp_path, monkeypatch):
+    placeholder = tmp_path / "placeholder"
+    placeholder.mkdir()
+    (placeholder / "avatar.png").write_bytes(b"png")
+    (placeholder / "season.png").write_bytes(b"png")
+    (placeholder / "season.webp").write_bytes(b"webp")
+    static = CustomStaticFiles(directory=tmp_path)
+    lookups = []
+    original = static.lookup_path
+
+    def lookup_path(path):
+        lookups.append(path)
+        return original(path)
+
+    monkeypatch.setattr(static, "lookup_path", lookup_path)
+    client = TestClient(Starlette(routes=[Mount("/resources", app=static)]))
+    for _ in range(3):
+        assert client.get("/resources/placeholder/avatar.png", headers={"Accept": "image/webp"}).content == b"png"
+        assert client.get("/resources/placeholder/season.png", headers={"Accept": "image/webp"}).content == b"webp"
+    assert sorted(lookups) == ["placeholder/avatar.png", "placeholder/avatar.webp", "placeholder/season.webp"]
@@ -0,0 +1,22 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.schemas.base import BizException
+from app.services.upload import save_upload_file
+
+
+async def test_upload_is_streamed_into_a_temp_file_with_digest(tmp_path):
+    hasher = hashlib.sha256()
+    src = await save_upload_file(UploadFile(io.BytesIO(b"hello"), filename="a.png"), tmp_path, hasher=hasher)
+    assert src.parent == tmp_path
+    assert src.read_bytes() == b"hello"
+    assert hasher.hexdigest() == hashlib.sha256(b"hello").hexdigest()
+
+
+async def test_oversize_upload_leaves_no_temp_file(tmp_path):
+    with pytest.raises(BizException):
+        await save_upload_file(UploadFile(io.BytesIO(b"x" * 10), filename="a.png"), tmp_path, max_bytes=5)
+    assert list(tmp_path.iterdir()) == []
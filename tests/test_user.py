@@ -0,0 +1,61 @@
+from math import gcd
+from types import SimpleNamespace
+
+import pytest
+
+from app.crud import user as user_crud
+from app.schemas.base import BizException
+from app.services import user as user_service
+from tests.fakes import FakeSession, compile_pg
+
+
+def test_user_id_mapping_is_a_bijection():
+    assert gcd(user_crud.USER_ID_MULTIPLIER, user_crud.USER_ID_MODULUS) == 1
+    ids = {(n * user_crud.USER_ID_MULTIPLIER) % user_crud.USER_ID_MODULUS for n in range(1, 20001)}
+    assert len(ids) == 20000
+
+
+async def test_create_user_is_a_single_sequence_backed_upsert(monkeypatch):
+    created = SimpleNamespace(user_id="10000000001")
+    db = FakeSession([[created]])
+    assert await user_crud.create_user(db, "13800000000") is created
+    sql = compile_pg(db.statements[0])
+    assert "nextval('user_id_seq')" in sql
+    assert "ON CONFLICT DO NOTHING" in sql
+    assert "RETURNING" in sql
+    assert db.info["users_by_user_id"] == {"10000000001": created}
+
+
+async def test_create_user_retries_when_default_nickname_is_taken(monkeypatch):
+    async def get_user_by_phone(db, phone_number):
+        return None
+
+    monkeypatch.setattr(user_crud, "get_user_by_phone", get_user_by_phone)
+    created = SimpleNamespace(user_id="10000000002")
+    db = FakeSession([[], [created]])
+    assert await user_crud.create_user(db, "13800000000") is created
+    assert len(db.statements) == 2
+
+
+async def test_create_user_returns_none_when_phone_registered_concurrently(monkeypatch):
+    existing = SimpleNamespace(user_id="10000000003")
+
+    async def get_user_by_phone(db, phone_number):
+        return existing
+
+    monkeypatch.setattr(user_crud, "get_user_by_phone", get_user_by_phone)
+    db = FakeSession([[]])
+    assert await user_crud.create_user(db, "13800000000") is None
+    assert len(db.statements) == 1
+
+
+async def test_register_fails_cleanly_when_attempts_are_exhausted(monkeypatch):
+    async def get_user_by_phone(db, phone_number):
+        return None
+
+    monkeypatch.setattr(user_crud, "get_user_by_phone", get_user_by_phone)
+    monkeypatch.setattr(user_service, "get_user_by_phone", get_user_by_phone)
+    db = FakeSession([[]] * user_crud.USER_CREATE_MAX_ATTEMPTS)
+    with pytest.raises(BizException):
+        await user_service.login_or_register("13800000000", db)
+    assert len(db.statements) == user_crud.USER_CREATE_MAX_ATTEMPTS
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.schemas.user import RelationshipStatus
+from app.services import user_follow as user_follow_service
+
+
+def _fake_relationship_source(monkeypatch, relationships, started=None, release=None):
+    calls = []
+
+    async def get_users_by_ids(db, user_ids):
+        return {user_id: SimpleNamespace(id=user_id) for user_id in user_ids}
+
+    async def get_relationship_crud(db, follower_db_id, followed_db_id):
+        calls.append((follower_db_id, followed_db_id))
+        relationship = relationships[0]
+        if started is not None:
+            started.set()
+        if release is not None:
+            await release.wait()
+        return relationship
+
+    monkeypatch.setattr(user_follow_service, "get_users_by_ids", get_users_by_ids)
+    monkeypatch.setattr(user_follow_service.user_follow, "get_relationship_crud", get_relationship_crud)
+    monkeypatch.setattr(user_follow_service, "is_primary_session", lambda db: True)
+    return calls
+
+
+async def test_relationship_is_served_from_cache(fake_redis, monkeypatch):
+    calls = _fake_relationship_source(monkeypatch, [RelationshipStatus.following])
+    for _ in range(2):
+        assert await user_follow_service.get_relationship_service(None, "a", "b") == RelationshipStatus.following
+    assert len(calls) == 1
+
+
+async def test_invalidation_drops_cached_relationship(fake_redis, monkeypatch):
+    relationships = [RelationshipStatus.following]
+    calls = _fake_relationship_source(monkeypatch, relationships)
+    await user_follow_service.get_relationship_service(None, "a", "b")
+    relationships[0] = RelationshipStatus.none
+    # 反方向的关注同样使 a->b 的缓存失效
+    await user_follow_service.invalidate_relationship_cache("b", "a")
+    assert await user_follow_service.get_relationship_service(None, "a", "b") == RelationshipStatus.none
+    assert len(calls) == 2
+
+
+async def test_stale_fill_racing_invalidation_is_not_served(fake_redis, monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    relationships = [RelationshipStatus.following]
+    _fake_relationship_source(monkeypatch, relationships, started, release)
+    reader = asyncio.create_task(user_follow_service.get_relationship_service(None, "a", "b"))
+    await started.wait()
+    # 读者已查到旧关系，此时取关提交并失效缓存，随后读者才回填
+    relationships[0] = RelationshipStatus.none
+    await user_follow_service.invalidate_relationship_cache("a", "b")
+    release.set()
+    assert await reader == RelationshipStatus.following
+    assert await user_follow_service.get_relationship_service(None, "a", "b") == RelationshipStatus.none